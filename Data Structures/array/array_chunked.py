@@ -0,0 +1,205 @@
+# array_chunked.py
+
+import array
+import itertools
+import operator
+import zlib
+
+CHUNK_ITEMS = 64 * 1024
+# delta编码时按差值的范围选择最小的整数类型
+DELTA_TYPECODES = 'bhiq'
+
+
+class ChunkedArray:
+    """由固定大小的块组成的可增长数组
+
+    追加时只会重新分配最后一块，不会复制整个数组。
+    compress()把除最后几块以外的块用zlib或者delta编码压缩；
+    读取压缩的块时解压，最近解压的一块被缓存。
+    """
+
+    def __init__(self, typecode, iterable=(), chunk_size=CHUNK_ITEMS):
+        self.typecode = typecode
+        self.itemsize = array.array(typecode).itemsize
+        self.chunk_size = chunk_size
+        # 每一块是array.array，或者压缩后的(编码, 数据)
+        self._chunks = [array.array(typecode)]
+        self._length = 0
+        self._cached = (None, None)     # (块号, 解压后的array)
+        self.extend(iterable)
+
+    def __len__(self):
+        return self._length
+
+    def _tail(self):
+        """返回可以追加的最后一块，需要时新建一块"""
+        tail = self._chunks[-1]
+        # 只有满的块才会被压缩
+        if not isinstance(tail, array.array) or len(tail) == self.chunk_size:
+            tail = array.array(self.typecode)
+            self._chunks.append(tail)
+        return tail
+
+    def append(self, value):
+        self._tail().append(value)
+        self._length += 1
+
+    def extend(self, iterable):
+        iterator = iter(iterable)
+        while True:
+            tail = self._tail()
+            room = self.chunk_size - len(tail)
+            before = len(tail)
+            tail.extend(itertools.islice(iterator, room))
+            self._length += len(tail) - before
+            if len(tail) - before < room:
+                return
+
+    def _chunk(self, number):
+        chunk = self._chunks[number]
+        if isinstance(chunk, array.array):
+            return chunk
+        cached_number, cached = self._cached
+        if cached_number != number:
+            cached = self._decode(chunk)
+            self._cached = (number, cached)
+        return cached
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                # islice()不支持负的步长，按下标逐个取值
+                return array.array(self.typecode,
+                                   map(self.__getitem__,
+                                       range(start, stop, step)))
+            result = array.array(self.typecode)
+            size = self.chunk_size
+            for number in range(start // size, -(-stop // size)):
+                chunk = self._chunk(number)
+                base = number * size
+                result.extend(chunk[max(start - base, 0):stop - base])
+            return result
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('array index out of range')
+        number, offset = divmod(index, self.chunk_size)
+        return self._chunk(number)[offset]
+
+    def __setitem__(self, index, value):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('array assignment index out of range')
+        number, offset = divmod(index, self.chunk_size)
+        chunk = self._chunk(number)
+        chunk[offset] = value
+        # 修改过的块不再压缩
+        self._chunks[number] = chunk
+        self._cached = (None, None)
+
+    def chunks(self):
+        for number in range(len(self._chunks)):
+            yield self._chunk(number)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+    def iterbytes(self):
+        """按块产生数组的字节，不需要一次构造整个bytes对象"""
+        for chunk in self.chunks():
+            yield chunk.tobytes()
+
+    def tobytes(self):
+        return b''.join(self.iterbytes())
+
+    def tofile(self, f):
+        for data in self.iterbytes():
+            f.write(data)
+
+    def compress(self, codec='zlib', hot=1, level=1):
+        """压缩除最后hot块以外所有没有压缩的块，返回压缩的块数"""
+        if codec == 'delta' and self.typecode not in 'bBhHiIlLqQ':
+            raise ValueError('delta encoding needs an integer typecode')
+        count = 0
+        for number, chunk in enumerate(self._chunks[:-hot or None]):
+            if (not isinstance(chunk, array.array) or
+                    len(chunk) < self.chunk_size):
+                continue
+            if codec == 'zlib':
+                self._chunks[number] = ('zlib', zlib.compress(chunk, level))
+            elif codec == 'delta':
+                encoded = self._delta(chunk)
+                if encoded is None:
+                    continue
+                self._chunks[number] = ('delta', encoded)
+            else:
+                raise ValueError('unknown codec: {!r}'.format(codec))
+            count += 1
+        return count
+
+    def _delta(self, chunk):
+        deltas = list(map(operator.sub, chunk[1:], chunk[:-1]))
+        low, high = min(deltas, default=0), max(deltas, default=0)
+        for typecode in DELTA_TYPECODES:
+            bits = array.array(typecode).itemsize * 8 - 1
+            if -2 ** bits <= low and high < 2 ** bits:
+                return chunk[0], array.array(typecode, deltas)
+        return None     # 差值超出了'q'的范围，不压缩这一块
+
+    def _decode(self, chunk):
+        codec, data = chunk
+        if codec == 'zlib':
+            result = array.array(self.typecode)
+            result.frombytes(zlib.decompress(data))
+            return result
+        first, deltas = data
+        return array.array(self.typecode,
+                           itertools.accumulate(deltas, initial=first))
+
+    def nbytes(self):
+        """保存数据占用的字节数(不包括对象本身的开销)"""
+        total = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, array.array):
+                total += chunk.buffer_info()[1] * self.itemsize
+            elif chunk[0] == 'zlib':
+                total += len(chunk[1])
+            else:
+                deltas = chunk[1][1]
+                total += len(deltas) * deltas.itemsize + self.itemsize
+        return total
+
+    def __repr__(self):
+        compressed = sum(not isinstance(c, array.array)
+                         for c in self._chunks)
+        return '{}({!r}, length={}, chunks={}, compressed={})'.format(
+            type(self).__name__, self.typecode, self._length,
+            len(self._chunks), compressed)
+
+
+if __name__ == '__main__':
+    a = ChunkedArray('i', range(10), chunk_size=4)
+    print(a)
+    print('Chunks :', list(a.chunks()))
+    a.append(10)
+    a.extend(range(11, 14))
+    print('Slice  :', a[2:11])
+    print('a[-1]  :', a[-1])
+    print('a[::-3]:', a[::-3])
+
+    print('\nCompressed:', a.compress('delta'), 'chunks')
+    print(a)
+    print('Encoded:', a._chunks[0])
+    print('Slice  :', a[2:11])
+    print('Bytes  :', a.tobytes() == array.array('i', range(14)).tobytes())
+
+    timestamps = ChunkedArray('q', range(1500000000, 1500010000, 3),
+                              chunk_size=1024)
+    before = timestamps.nbytes()
+    timestamps.compress('delta', hot=0)
+    print('\ntimestamps: {} -> {} bytes'.format(before, timestamps.nbytes()))
+    timestamps.append(1500010000)
+    print(timestamps, timestamps[-2:])
@@ -0,0 +1,67 @@
+# array_chunked_benchmark.py
+
+import array
+import random
+import sys
+import time
+
+from array_chunked import ChunkedArray
+
+
+def append_latencies(a, values):
+    """逐个追加，记录每次append()的耗时(纳秒)"""
+    latencies = array.array('q', bytes(8 * len(values)))
+    clock = time.perf_counter_ns
+    append = a.append
+    for i, value in enumerate(values):
+        start = clock()
+        append(value)
+        latencies[i] = clock() - start
+    return sorted(latencies)
+
+
+def allocated(a):
+    """sys.getsizeof()包括数组已经分配(包括预留)的缓冲区"""
+    if isinstance(a, ChunkedArray):
+        return sys.getsizeof(a._chunks) + sum(map(sys.getsizeof, a._chunks))
+    return sys.getsizeof(a)
+
+
+def percentile(data, p):
+    return data[min(int(len(data) * p), len(data) - 1)]
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+random.seed(2016)
+# 类似时间戳的数据：递增，间隔有少量抖动
+values = array.array('q', bytes(8 * count))
+t = 1500000000000
+for i in range(count):
+    t += 1000 + random.randrange(-50, 50)
+    values[i] = t
+
+print('{:<14} {:>8} {:>8} {:>8} {:>10} {:>10}'.format(
+    'structure', 'p50(ns)', 'p99', 'p99.9', 'max(ms)', 'memory'))
+for name, factory in [('array.array', lambda: array.array('q')),
+                      ('ChunkedArray', lambda: ChunkedArray('q'))]:
+    a = factory()
+    latencies = append_latencies(a, values)
+    memory = allocated(a)
+    print('{:<14} {:>8} {:>8} {:>8} {:>10.2f} {:>8.1f}MB'.format(
+        name, percentile(latencies, 0.5), percentile(latencies, 0.99),
+        percentile(latencies, 0.999), latencies[-1] / 1e6,
+        memory / 2 ** 20))
+    del a, latencies
+
+for codec in ('zlib', 'delta'):
+    c = ChunkedArray('q', values)
+    before = c.nbytes()
+    start = time.perf_counter()
+    c.compress(codec)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    c.tobytes()
+    read = time.perf_counter() - start
+    print('compress {:<6} {:.1f}MB -> {:.1f}MB in {:.2f}s, '
+          'read back in {:.2f}s'.format(codec, before / 2 ** 20,
+                                        c.nbytes() / 2 ** 20, elapsed, read))
@@ -0,0 +1,192 @@
+# array_mmap.py
+
+import array
+import mmap
+import sys
+
+CHUNK_ITEMS = 64 * 1024
+
+
+class MappedArray:
+    """映射到文件上的类型化数组，不把文件读入内存
+
+    字节顺序与本机相同时，通过memoryview.cast()直接访问映射的内存；
+    否则读取的元素先复制到array.array中再byteswap()。
+    操作系统在访问时才把对应的页读入内存，advise()可以提示访问模式。
+    与array.array一样，切片返回一个新的数组；view()返回不复制数据的子视图。
+    """
+
+    def __init__(self, f, typecode, byteorder=sys.byteorder, offset=0,
+                 length=None, writable=False):
+        self.typecode = typecode
+        self.itemsize = array.array(typecode).itemsize
+        self.byteorder = byteorder
+        self._swap = byteorder != sys.byteorder
+        self._mmap = mmap.mmap(
+            f.fileno(), 0,
+            access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        if length is None:
+            length = (len(self._mmap) - offset) // self.itemsize
+        self._start = offset
+        self._bytes = memoryview(self._mmap)[
+            offset:offset + length * self.itemsize]
+        self._items = None if self._swap else self._bytes.cast(typecode)
+        self._length = length
+        self._is_view = False
+
+    @classmethod
+    def _view(cls, parent, start, stop):
+        view = cls.__new__(cls)
+        view.__dict__.update(parent.__dict__)
+        view._bytes = parent._bytes[start * parent.itemsize:
+                                    stop * parent.itemsize]
+        if parent._items is not None:
+            view._items = parent._items[start:stop]
+        view._start = parent._start + start * parent.itemsize
+        view._length = stop - start
+        view._is_view = True
+        return view
+
+    def __len__(self):
+        return self._length
+
+    def _read(self, start, stop):
+        """把[start, stop)复制到一个本机字节顺序的array中"""
+        a = array.array(self.typecode)
+        a.frombytes(self._bytes[start * self.itemsize:stop * self.itemsize])
+        if self._swap:
+            a.byteswap()
+        return a
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step == 1:
+                return self._read(start, max(start, stop))
+            if self._items is not None:
+                return array.array(self.typecode, self._items[index])
+            # 先按本机顺序取出选中的元素的字节，只复制和交换这些元素
+            a = array.array(self.typecode)
+            with self._bytes.cast(self.typecode) as raw, raw[index] as items:
+                a.frombytes(items.tobytes())
+            a.byteswap()
+            return a
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('array index out of range')
+        if self._items is not None:
+            return self._items[index]
+        return self._read(index, index + 1)[0]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1 or stop - start != len(value):
+                raise ValueError('slice assignment must not resize the array')
+            values = array.array(self.typecode, value)
+        else:
+            if index < 0:
+                index += self._length
+            if not 0 <= index < self._length:
+                raise IndexError('array assignment index out of range')
+            if self._items is not None:
+                self._items[index] = value
+                return
+            start = index
+            values = array.array(self.typecode, [value])
+        if self._swap:
+            values.byteswap()
+        offset = start * self.itemsize
+        self._bytes[offset:offset + len(values) * self.itemsize] = \
+            values.tobytes()
+
+    def chunks(self, size=CHUNK_ITEMS):
+        """按顺序产生每一块数据；本机字节顺序时是不复制的memoryview"""
+        for start in range(0, self._length, size):
+            stop = min(start + size, self._length)
+            if self._items is not None:
+                yield self._items[start:stop]
+            else:
+                yield self._read(start, stop)
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+    def view(self, start, stop):
+        """不复制数据的子视图"""
+        start, stop, _ = slice(start, stop).indices(self._length)
+        return self._view(self, start, max(start, stop))
+
+    def advise(self, option, start=0, stop=None):
+        """把访问模式提示(mmap.MADV_*)交给操作系统，不支持时忽略"""
+        if not hasattr(self._mmap, 'madvise'):
+            return
+        stop = self._length if stop is None else stop
+        # madvise()的起点必须按页对齐
+        begin = self._start + start * self.itemsize
+        aligned = begin - begin % mmap.PAGESIZE
+        self._mmap.madvise(option, aligned,
+                           self._start + stop * self.itemsize - aligned)
+
+    def prefetch(self, start=0, stop=None):
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            self.advise(mmap.MADV_WILLNEED, start, stop)
+
+    def flush(self):
+        self._mmap.flush()
+
+    def close(self):
+        # 必须先释放所有的memoryview(包括子视图的)才能关闭mmap
+        if self._items is not None:
+            self._items.release()
+        self._bytes.release()
+        if not self._is_view:
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return 'MappedArray({!r}, byteorder={!r}, length={})'.format(
+            self.typecode, self.byteorder, self._length)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    a = array.array('i', range(0x12345678, 0x12345678 + 10))
+    swapped = array.array('i', a)
+    swapped.byteswap()
+    other = 'big' if sys.byteorder == 'little' else 'little'
+
+    with tempfile.TemporaryFile() as f:
+        a.tofile(f)
+        swapped.tofile(f)
+        f.flush()
+
+        with MappedArray(f, 'i', length=len(a)) as native:
+            print(native)
+            print('native[2]   :', native[2])
+            print('native[-3:] :', native[-3:])
+            print('native[::4] :', native[::4])
+
+        offset = len(a) * a.itemsize
+        with MappedArray(f, 'i', byteorder=other, offset=offset,
+                         writable=True) as m:
+            print('\n' + repr(m))
+            print('other[2]    :', m[2])
+            print('other[-3:]  :', m[-3:])
+            print('other[::-4] :', m[::-4])
+            m[0] = -1
+            m.prefetch()
+            print('sum         :', sum(m))
+            with m.view(4, 7) as middle:
+                print('view(4, 7)  :', list(middle))
+
+        f.seek(offset)
+        print('\nraw first item:', f.read(4).hex())
@@ -0,0 +1,73 @@
+# array_mmap_benchmark.py
+
+import array
+import random
+import sys
+import tempfile
+import time
+
+from array_mmap import MappedArray
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+lookups = 100000
+other = 'big' if sys.byteorder == 'little' else 'little'
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def random_reads(a, indexes):
+    return sum(a[i] for i in indexes)
+
+
+def sequential_sum(a):
+    if isinstance(a, MappedArray):
+        return sum(sum(chunk) for chunk in a.chunks())
+    return sum(a)
+
+
+data = array.array('d', range(count))
+random.seed(2016)
+indexes = [random.randrange(count) for _ in range(lookups)]
+
+print('{:<20} {:>10} {:>16} {:>14}'.format(
+    'storage', 'open(s)', '100k random(s)', 'sequential(s)'))
+with tempfile.TemporaryFile() as native_file, \
+        tempfile.TemporaryFile() as swapped_file:
+    data.tofile(native_file)
+    native_file.flush()
+    data.byteswap()
+    data.tofile(swapped_file)
+    swapped_file.flush()
+    del data
+
+    def load():
+        native_file.seek(0)
+        a = array.array('d')
+        a.fromfile(native_file, count)
+        return a
+
+    def load_swapped():
+        a = array.array('d')
+        swapped_file.seek(0)
+        a.fromfile(swapped_file, count)
+        a.byteswap()
+        return a
+
+    for name, opener in [
+            ('fromfile', load),
+            ('fromfile+byteswap', load_swapped),
+            ('MappedArray', lambda: MappedArray(native_file, 'd')),
+            ('MappedArray swapped',
+             lambda: MappedArray(swapped_file, 'd', byteorder=other))]:
+        open_time, a = timed(opener)
+        random_time, r = timed(lambda: random_reads(a, indexes))
+        seq_time, total = timed(lambda: sequential_sum(a))
+        print('{:<20} {:>10.3f} {:>16.3f} {:>14.3f}'.format(
+            name, open_time, random_time, seq_time))
+        if isinstance(a, MappedArray):
+            a.close()
+        del a
@@ -0,0 +1,62 @@
+# bisect_batch.py
+
+import array
+import bisect
+import functools
+import itertools
+import operator
+
+
+def is_sorted(values):
+    return all(map(operator.le, values, itertools.islice(values, 1, None)))
+
+
+def bisect_many(boundaries, probes, side='right'):
+    """一次求出所有probes在boundaries中的插入位置，返回array('q')
+
+    probes已经排好序时，沿着boundaries做一次归并式的扫描：对每个边界值只
+    调用一次bisect找到probes中越过它的位置，然后整段填入相同的插入位置。
+    否则对每个probe分别调用bisect，但循环在C中通过map()完成。
+    """
+    if side == 'right':
+        find = bisect.bisect_right
+        # probe p的插入位置是满足boundary <= p的边界的个数
+        split = bisect.bisect_left
+    elif side == 'left':
+        find = bisect.bisect_left
+        split = bisect.bisect_right
+    else:
+        raise ValueError('side must be "left" or "right"')
+
+    if not isinstance(probes, (list, tuple, array.array)):
+        probes = list(probes)
+    result = array.array('q')
+    if not is_sorted(probes) or len(boundaries) >= len(probes):
+        result.extend(map(functools.partial(find, boundaries), probes))
+        return result
+
+    start = 0
+    position = 0
+    for boundary in boundaries:
+        end = split(probes, boundary, start)
+        if end > start:
+            result.extend(array.array('q', [position]) * (end - start))
+            start = end
+        position += 1
+    result.extend(array.array('q', [position]) * (len(probes) - start))
+    return result
+
+
+if __name__ == '__main__':
+    # 把时间戳(秒)按小时分桶
+    boundaries = [3600 * h for h in range(1, 6)]
+    timestamps = array.array('q', [5, 3599, 3600, 4000, 9000, 14400, 20000])
+
+    print('boundaries:', boundaries)
+    print('sorted    :', list(timestamps))
+    print('right     :', list(bisect_many(boundaries, timestamps)))
+    print('left      :', list(bisect_many(boundaries, timestamps, 'left')))
+
+    shuffled = [9000, 5, 20000, 3600, 14400]
+    print('unsorted  :', shuffled)
+    print('right     :', list(bisect_many(boundaries, shuffled)))
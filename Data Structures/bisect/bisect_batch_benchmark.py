@@ -0,0 +1,44 @@
+# bisect_batch_benchmark.py
+
+import array
+import bisect
+import random
+import sys
+import time
+
+from bisect_batch import bisect_many
+
+
+def python_loop(boundaries, probes):
+    result = array.array('q')
+    for p in probes:
+        result.append(bisect.bisect_right(boundaries, p))
+    return result
+
+
+def timed(label, func, boundaries, probes, expected=None):
+    start = time.perf_counter()
+    result = func(boundaries, probes)
+    elapsed = time.perf_counter() - start
+    ok = '' if expected is None else ('ok' if result == expected else 'WRONG')
+    print('{:<28} {:>8.3f}s {:>14,.0f} probes/s {}'.format(
+        label, elapsed, len(probes) / elapsed, ok))
+    return result
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+random.seed(2016)
+day = 24 * 3600
+boundaries = sorted(random.sample(range(day), 1000))
+timestamps = array.array('q', (random.randrange(day) for _ in range(n)))
+sorted_timestamps = array.array('q', sorted(timestamps))
+print('{:,} probes, {:,} boundaries'.format(n, len(boundaries)))
+
+expected = timed('loop, unsorted probes', python_loop,
+                 boundaries, timestamps)
+timed('bisect_many, unsorted', bisect_many,
+      boundaries, timestamps, expected)
+expected = timed('loop, sorted probes', python_loop,
+                 boundaries, sorted_timestamps)
+timed('bisect_many, sorted', bisect_many,
+      boundaries, sorted_timestamps, expected)
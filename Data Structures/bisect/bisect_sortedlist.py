@@ -0,0 +1,230 @@
+# bisect_sortedlist.py
+
+import bisect
+
+
+class SortedList:
+    """由多个有界大小的有序块组成的有序列表
+
+    每个块都是一个普通的列表，插入和删除只需要移动一个块中的元素。
+    _maxes保存每个块的最大值，用bisect找到元素所在的块；
+    _index是块长度的树状数组(Fenwick树)，用于按位置访问和计算排名；
+    块被拆分或合并后它就失效了，等到下次需要时才重建。
+    """
+
+    def __init__(self, iterable=(), load=1000):
+        self._load = load
+        self._lists = []
+        self._maxes = []
+        self._index = None
+        self._len = 0
+        self.update(iterable)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for chunk in self._lists:
+            yield from chunk
+
+    def __repr__(self):
+        return 'SortedList({!r})'.format(list(self))
+
+    def update(self, iterable):
+        values = sorted(list(self) + list(iterable))
+        load = self._load
+        self._lists = [values[i:i + load]
+                       for i in range(0, len(values), load)]
+        self._maxes = [chunk[-1] for chunk in self._lists]
+        self._len = len(values)
+        self._index = None
+
+    # 树状数组：_index[i]保存若干个连续块的长度之和
+    def _build_index(self):
+        index = [len(chunk) for chunk in self._lists]
+        for i in range(len(index)):
+            parent = i | (i + 1)
+            if parent < len(index):
+                index[parent] += index[i]
+        self._index = index
+        return index
+
+    def _index_add(self, pos, delta):
+        index = self._index
+        if index is None:
+            return
+        while pos < len(index):
+            index[pos] += delta
+            pos |= pos + 1
+
+    def _prefix(self, pos):
+        """前pos个块的元素总数"""
+        total = 0
+        index = self._index or self._build_index()
+        while pos > 0:
+            total += index[pos - 1]
+            pos &= pos - 1
+        return total
+
+    def _locate(self, idx):
+        """把全局位置转换成(块, 块内偏移)"""
+        index = self._index or self._build_index()
+        pos = 0
+        step = 1 << (len(index).bit_length() - 1) if index else 0
+        while step:
+            nxt = pos + step
+            if nxt <= len(index) and index[nxt - 1] <= idx:
+                idx -= index[nxt - 1]
+                pos = nxt
+            step >>= 1
+        return pos, idx
+
+    def add(self, value):
+        maxes = self._maxes
+        if not maxes:
+            self._lists.append([value])
+            maxes.append(value)
+            self._len = 1
+            self._index = None
+            return
+        pos = bisect.bisect_right(maxes, value)
+        if pos == len(maxes):
+            pos -= 1
+            self._lists[pos].append(value)
+            maxes[pos] = value
+        else:
+            bisect.insort_right(self._lists[pos], value)
+        self._len += 1
+        if len(self._lists[pos]) > 2 * self._load:
+            self._split(pos)
+        else:
+            self._index_add(pos, 1)
+
+    def _split(self, pos):
+        chunk = self._lists[pos]
+        half = chunk[self._load:]
+        del chunk[self._load:]
+        self._lists.insert(pos + 1, half)
+        self._maxes[pos] = chunk[-1]
+        self._maxes.insert(pos + 1, half[-1])
+        self._index = None
+
+    def remove(self, value):
+        pos = bisect.bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            raise ValueError('{!r} not in list'.format(value))
+        chunk = self._lists[pos]
+        i = bisect.bisect_left(chunk, value)
+        if chunk[i] != value:
+            raise ValueError('{!r} not in list'.format(value))
+        self._delete(pos, i)
+
+    def discard(self, value):
+        try:
+            self.remove(value)
+        except ValueError:
+            pass
+
+    def pop(self, idx=-1):
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError('pop index out of range')
+        pos, i = self._locate(idx)
+        value = self._lists[pos][i]
+        self._delete(pos, i)
+        return value
+
+    def _delete(self, pos, i):
+        chunk = self._lists[pos]
+        del chunk[i]
+        self._len -= 1
+        if not chunk:
+            del self._lists[pos]
+            del self._maxes[pos]
+            self._index = None
+            return
+        self._maxes[pos] = chunk[-1]
+        if len(chunk) < self._load // 2 and len(self._lists) > 1:
+            # 太小的块与相邻的块合并，必要时再拆分
+            if pos == len(self._lists) - 1:
+                pos -= 1
+            self._lists[pos].extend(self._lists.pop(pos + 1))
+            self._maxes.pop(pos)
+            self._maxes[pos] = self._lists[pos][-1]
+            if len(self._lists[pos]) > 2 * self._load:
+                self._split(pos)
+            else:
+                self._index = None
+        else:
+            self._index_add(pos, -1)
+
+    def __contains__(self, value):
+        pos = bisect.bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return False
+        chunk = self._lists[pos]
+        return chunk[bisect.bisect_left(chunk, value)] == value
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += self._len
+        if not 0 <= idx < self._len:
+            raise IndexError('list index out of range')
+        pos, i = self._locate(idx)
+        return self._lists[pos][i]
+
+    def bisect_left(self, value):
+        """value的排名：小于value的元素个数"""
+        pos = bisect.bisect_left(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        return self._prefix(pos) + bisect.bisect_left(self._lists[pos], value)
+
+    def bisect_right(self, value):
+        pos = bisect.bisect_right(self._maxes, value)
+        if pos == len(self._maxes):
+            return self._len
+        return self._prefix(pos) + bisect.bisect_right(self._lists[pos], value)
+
+    bisect = bisect_right
+
+    def index(self, value):
+        idx = self.bisect_left(value)
+        if idx == self._len or self[idx] != value:
+            raise ValueError('{!r} not in list'.format(value))
+        return idx
+
+    def irange(self, minimum, maximum):
+        """按顺序产生minimum <= value <= maximum的元素"""
+        pos = bisect.bisect_left(self._maxes, minimum)
+        if pos == len(self._maxes):
+            return
+        i = bisect.bisect_left(self._lists[pos], minimum)
+        for chunk in self._lists[pos:]:
+            for value in chunk[i:] if i else chunk:
+                if value > maximum:
+                    return
+                yield value
+            i = 0
+
+
+if __name__ == '__main__':
+    values = [14, 85, 77, 26, 50, 45, 66, 79, 10, 3, 84, 77, 1]
+
+    print('New Pos Contents')
+    print('--- --- --------')
+
+    # 很小的块，这样可以看到拆分
+    l = SortedList(load=2)
+    for i in values:
+        position = l.bisect_left(i)
+        l.add(i)
+        print('{:3} {:3}'.format(i, position), l._lists)
+
+    print()
+    print('rank of 50  :', l.index(50))
+    print('l[6]        :', l[6])
+    print('20 <= x <= 80:', list(l.irange(20, 80)))
+    l.remove(77)
+    print('remove 77   :', list(l))
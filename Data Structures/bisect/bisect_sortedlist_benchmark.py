@@ -0,0 +1,53 @@
+# bisect_sortedlist_benchmark.py
+
+import bisect
+import random
+import sys
+import time
+
+from bisect_sortedlist import SortedList
+
+
+def timed(func, values):
+    start = time.perf_counter()
+    func(values)
+    return time.perf_counter() - start
+
+
+def with_insort(values):
+    l = []
+    for v in values:
+        bisect.insort_left(l, v)
+
+
+def with_sortedlist(values):
+    l = SortedList()
+    for v in values:
+        l.add(v)
+
+
+largest = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+# insort的总开销是O(n**2)，超过这个规模就不再运行
+insort_limit = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 6
+
+random.seed(2016)
+print('{:>10} {:>12} {:>14} {:>16}'.format(
+    'n', 'insort(s)', 'SortedList(s)', 'rank+delete(s)'))
+n = 1000
+while n <= largest:
+    values = [random.random() for _ in range(n)]
+    insort_time = timed(with_insort, values) if n <= insort_limit else None
+    sorted_time = timed(with_sortedlist, values)
+
+    l = SortedList(values)
+    probes = random.sample(values, min(n, 100000))
+    start = time.perf_counter()
+    for v in probes:
+        l.bisect_left(v)
+        l.remove(v)
+    other_time = time.perf_counter() - start
+
+    print('{:>10,} {:>12} {:>14.3f} {:>16.3f}'.format(
+        n, '-' if insort_time is None else '{:.3f}'.format(insort_time),
+        sorted_time, other_time))
+    n *= 10
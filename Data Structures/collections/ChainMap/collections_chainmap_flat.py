@@ -0,0 +1,188 @@
+# collections_chainmap_flat.py
+
+import collections
+import weakref
+
+
+class VersionedDict(dict):
+    """每次修改都增加version并通知使用它的FlatChainMap"""
+
+    def __init__(self, *args, **kwds):
+        super().__init__(*args, **kwds)
+        self.version = 0
+        # id(chain) -> weakref；ChainMap不可哈希，所以不能用WeakSet
+        self._listeners = {}
+
+    def _listen(self, chain):
+        listeners = self._listeners
+        listeners[id(chain)] = weakref.ref(
+            chain, lambda ref, key=id(chain): listeners.pop(key, None))
+
+    def _changed(self, key):
+        self.version += 1
+        for ref in list(self._listeners.values()):
+            chain = ref()
+            if chain is not None:
+                chain._layer_changed(key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed(key)
+
+    def pop(self, key, *default):
+        had_key = key in self
+        value = super().pop(key, *default)
+        if had_key:
+            self._changed(key)
+        return value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    # 批量修改使整个快照失效
+    def update(self, *args, **kwds):
+        super().update(*args, **kwds)
+        self._changed(None)
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed(None)
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed(None)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        # 弱引用不能pickle，也不应该被deepcopy复制：副本的修改不能通知原来的链。
+        # 通过构造函数重建，不经过会发出通知的__setitem__
+        state = self.__dict__.copy()
+        del state['_listeners']
+        return type(self), (dict(self),), state
+
+
+class FlatChainMap(collections.ChainMap):
+    """把所有映射合并成一个字典缓存起来的ChainMap
+
+    读操作只查一次合并后的字典，不再逐层查找。某一层的一个键被修改时，
+    只对这个键按顺序逐层查找来更新缓存；批量修改使缓存失效，
+    下一次读操作时重建。不是VersionedDict的映射会被复制成VersionedDict，
+    所以以后直接修改原来的对象不会反映到链中。直接修改maps列表以后
+    需要调用invalidate()。
+    """
+
+    def __init__(self, *maps):
+        super().__init__(*(m if isinstance(m, VersionedDict)
+                           else VersionedDict(m) for m in maps or [{}]))
+        self._flat = None
+        for m in self.maps:
+            m._listen(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_flat'] = None
+        return state
+
+    def __setstate__(self, state):
+        # pickle和deepcopy得到的层是新的对象，需要重新注册
+        self.__dict__.update(state)
+        self._flat = None
+        for m in self.maps:
+            m._listen(self)
+
+    def invalidate(self):
+        self._flat = None
+
+    def versions(self):
+        return [m.version for m in self.maps]
+
+    def _layer_changed(self, key):
+        flat = self._flat
+        if flat is None:
+            return
+        if key is None:
+            self._flat = None
+            return
+        for mapping in self.maps:
+            if key in mapping:
+                flat[key] = mapping[key]
+                return
+        flat.pop(key, None)
+
+    def _snapshot(self):
+        flat = self._flat
+        if flat is None:
+            flat = {}
+            for mapping in reversed(self.maps):
+                flat.update(mapping)
+            self._flat = flat
+        return flat
+
+    def __getitem__(self, key):
+        try:
+            return self._snapshot()[key]
+        except KeyError:
+            return self.__missing__(key)
+
+    def get(self, key, default=None):
+        return self._snapshot().get(key, default)
+
+    def __contains__(self, key):
+        return key in self._snapshot()
+
+    def __len__(self):
+        return len(self._snapshot())
+
+    def __iter__(self):
+        return iter(list(self._snapshot()))
+
+    def __bool__(self):
+        return bool(self._snapshot())
+
+
+if __name__ == '__main__':
+    import copy
+    import pickle
+
+    defaults = VersionedDict(color='red', user='guest', debug=False)
+    site = VersionedDict(color='blue')
+    request = VersionedDict()
+
+    config = FlatChainMap(request, site, defaults)
+    print(config['color'], config['user'], config['debug'])
+    print('snapshot:', config._flat)
+
+    site['debug'] = True            # 修改下层的一个键
+    request['color'] = 'green'      # 写入第一层
+    print('\nversions:', config.versions())
+    print(config['color'], config['user'], config['debug'])
+    print('snapshot:', config._flat)
+
+    del config['color']
+    print('\nafter del:', config['color'])
+
+    defaults.update(user='admin', lang='en')
+    print('after update, snapshot:', config._flat)
+    print(dict(config))
+
+    child = config.new_child()
+    child['user'] = 'bob'
+    print('\nchild :', child['user'], type(child).__name__)
+    print('parent:', config['user'])
+
+    clone = copy.deepcopy(config)
+    clone.maps[-1]['lang'] = 'fr'   # 只通知副本
+    print('\ndeepcopy:', clone['lang'], config['lang'])
+    restored = pickle.loads(pickle.dumps(config))
+    restored.maps[1]['user'] = 'eve'
+    print('unpickled:', restored['user'], restored.versions())
@@ -0,0 +1,46 @@
+# collections_chainmap_flat_benchmark.py
+
+import collections
+import random
+import sys
+import time
+
+from collections_chainmap_flat import FlatChainMap
+
+KEYS_PER_LAYER = 50
+
+
+def layers(depth):
+    # 越靠下的层键越多，大部分读操作要查到很深的层
+    return [{'layer{}_key{}'.format(i, k): k for k in range(KEYS_PER_LAYER)}
+            for i in range(depth)]
+
+
+def run(chain, keys, operations, write_ratio):
+    random.seed(2016)
+    # 写操作只写入第一层自己的键，不会遮住下面各层的键
+    ops = [(True, 'request_key{}'.format(random.randrange(100)))
+           if random.random() < write_ratio else (False, random.choice(keys))
+           for _ in range(operations)]
+    start = time.perf_counter()
+    for is_write, key in ops:
+        if is_write:
+            chain[key] = 0
+        else:
+            chain[key]
+    return operations / (time.perf_counter() - start)
+
+
+operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+print('{:>6} {:>7} {:>14} {:>14} {:>8}'.format(
+    'depth', 'writes', 'ChainMap', 'FlatChainMap', 'speedup'))
+for depth in (1, 5, 20, 50):
+    for write_ratio in (0.0, 0.01, 0.1, 0.5):
+        maps = layers(depth)
+        keys = [key for m in maps for key in m]
+        plain = run(collections.ChainMap({}, *maps), keys, operations,
+                    write_ratio)
+        flat = run(FlatChainMap({}, *maps), keys, operations, write_ratio)
+        print('{:>6} {:>7.0%} {:>10,.0f}/s {:>10,.0f}/s {:>7.1f}x'.format(
+            depth, write_ratio, plain, flat, flat / plain))
@@ -0,0 +1,98 @@
+# collections_counter_parallel.py
+
+import collections
+import multiprocessing
+import os
+import time
+
+CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def chunk_ranges(filename, chunk_size=CHUNK_SIZE):
+    size = os.path.getsize(filename)
+    return [(filename, start, min(start + chunk_size, size))
+            for start in range(0, size, chunk_size)]
+
+
+def count_range(args):
+    """统计[start, end)范围内开始的每一行中的单词
+
+    范围的边界不一定落在行首：从start开始的半行属于前一个范围，
+    最后一行即使越过了end也由这个范围读完。
+    """
+    filename, start, end = args
+    with open(filename, 'rb') as f:
+        if start:
+            f.seek(start - 1)
+            if f.read(1) != b'\n':
+                f.readline()
+        data = f.read(max(end - f.tell(), 0))
+        if data and not data.endswith(b'\n'):
+            data += f.readline()
+    return collections.Counter(data.split())
+
+
+def count_ranges(ranges):
+    """在一个工作进程中依次统计多个范围，只返回一个Counter"""
+    counter = collections.Counter()
+    for r in ranges:
+        counter.update(count_range(r))
+    return counter
+
+
+def merge_pair(pair):
+    left, right = pair
+    if right is not None:
+        left.update(right)
+    return left
+
+
+def tree_reduce(counters, pool=None):
+    """两两合并，每一层的合并可以在进程池中并行进行"""
+    counters = list(counters)
+    while len(counters) > 1:
+        pairs = [(counters[i], counters[i + 1] if i + 1 < len(counters)
+                  else None)
+                 for i in range(0, len(counters), 2)]
+        if pool is None:
+            counters = [merge_pair(p) for p in pairs]
+        else:
+            counters = pool.map(merge_pair, pairs)
+    return counters[0] if counters else collections.Counter()
+
+
+def parallel_count(filename, processes=None, chunk_size=CHUNK_SIZE,
+                   timings=None):
+    processes = processes or os.cpu_count()
+    ranges = chunk_ranges(filename, chunk_size)
+    # 每个进程处理多个块，内存由chunk_size限制，需要合并的Counter只有processes个
+    groups = [ranges[i::processes] for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        start = time.perf_counter()
+        partial = pool.map(count_ranges, groups, chunksize=1)
+        middle = time.perf_counter()
+        result = tree_reduce(partial, pool)
+        end = time.perf_counter()
+    if timings is not None:
+        timings['count'] = middle - start
+        timings['merge'] = end - middle
+    return result
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    with tempfile.NamedTemporaryFile('w', suffix='.log',
+                                     delete=False) as f:
+        for i in range(1000):
+            f.write('GET /index.html 200\nGET /about.html 404\n')
+            f.write('POST /login 200\n')
+    try:
+        # 很小的块，这样行会跨越块的边界
+        c = parallel_count(f.name, processes=2, chunk_size=100)
+        print(c.most_common(4))
+        with open(f.name, 'rb') as f2:
+            expected = collections.Counter(f2.read().split())
+        print('same as Counter:', c == expected)
+    finally:
+        os.remove(f.name)
@@ -0,0 +1,57 @@
+# collections_counter_parallel_benchmark.py
+
+import collections
+import os
+import random
+import sys
+import tempfile
+import time
+
+from collections_counter_parallel import parallel_count
+
+MB = 1024 * 1024
+
+
+def generate(filename, size):
+    # 单词的频率近似服从Zipf分布
+    random.seed(2016)
+    vocabulary = ['token{}'.format(i) for i in range(100000)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    written = 0
+    with open(filename, 'w') as f:
+        while written < size:
+            words = random.choices(vocabulary, weights, k=100000)
+            text = '\n'.join(' '.join(words[i:i + 10])
+                             for i in range(0, len(words), 10)) + '\n'
+            f.write(text)
+            written += len(text)
+
+
+size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+with tempfile.TemporaryDirectory() as dirname:
+    filename = os.path.join(dirname, 'corpus.txt')
+    generate(filename, size_mb * MB)
+
+    start = time.perf_counter()
+    with open(filename, 'rb') as f:
+        expected = collections.Counter()
+        for line in f:
+            expected.update(line.split())
+    baseline = time.perf_counter() - start
+    print('{} MB, {} CPUs, {:,} distinct tokens'.format(
+        size_mb, os.cpu_count(), len(expected)))
+    print('single-thread Counter.update: {:.2f}s'.format(baseline))
+
+    print('{:>9} {:>9} {:>9} {:>9} {:>8}'.format(
+        'processes', 'count(s)', 'merge(s)', 'total(s)', 'speedup'))
+    processes = 1
+    while processes <= max(os.cpu_count(), 4):
+        timings = {}
+        start = time.perf_counter()
+        result = parallel_count(filename, processes, 16 * MB, timings)
+        total = time.perf_counter() - start
+        assert result == expected
+        print('{:>9} {:>9.2f} {:>9.2f} {:>9.2f} {:>7.1f}x'.format(
+            processes, timings['count'], timings['merge'], total,
+            baseline / total))
+        processes *= 2
@@ -0,0 +1,101 @@
+# collections_counter_ranked.py
+
+import bisect
+import collections
+import collections.abc
+import itertools
+
+
+class RankedCounter(collections.Counter):
+    """随时可以用O(n)的开销取出most_common(n)的Counter
+
+    键按计数分组保存在桶中(计数 -> 按到达该计数的顺序排列的键)，
+    不同的计数值保存在一个有序列表中。计数改变时只需要把键移到另一个桶。
+    计数都是正整数时，总数为N的Counter最多只有约sqrt(2 * N)个不同的计数值，
+    所以这个有序列表很短。
+    """
+
+    def __init__(self, iterable=None, /, **kwds):
+        self._buckets = {}
+        self._levels = []   # 有序的不同计数值
+        super().__init__(iterable, **kwds)
+
+    def _unlink(self, key, count):
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            del self._levels[bisect.bisect_left(self._levels, count)]
+
+    def _link(self, key, count):
+        bucket = self._buckets.get(count)
+        if bucket is None:
+            bucket = self._buckets[count] = {}
+            bisect.insort(self._levels, count)
+        bucket[key] = None
+
+    def __setitem__(self, key, count):
+        if key in self:
+            old = dict.__getitem__(self, key)
+            if old == count:
+                return
+            self._unlink(key, old)
+        self._link(key, count)
+        super().__setitem__(key, count)
+
+    def __delitem__(self, key):
+        if key in self:
+            self._unlink(key, dict.__getitem__(self, key))
+        super().__delitem__(key)
+
+    def update(self, iterable=None, /, **kwds):
+        # Counter.update()在计数器为空时用dict.update()复制映射，
+        # 不经过__setitem__，所以映射总是逐个键加进去
+        if isinstance(iterable, collections.abc.Mapping):
+            get = self.get
+            for key, count in iterable.items():
+                self[key] = count + get(key, 0)
+            iterable = None
+        super().update(iterable, **kwds)
+
+    def pop(self, key, *default):
+        if key in self:
+            self._unlink(key, dict.__getitem__(self, key))
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, count = super().popitem()
+        self._unlink(key, count)
+        return key, count
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        super().clear()
+        self._buckets.clear()
+        self._levels.clear()
+
+    def most_common(self, n=None):
+        """从最大的计数开始逐个桶取键，只访问需要的部分"""
+        items = (
+            (key, count)
+            for count in reversed(self._levels)
+            for key in self._buckets[count]
+        )
+        return list(itertools.islice(items, n))
+
+
+if __name__ == '__main__':
+    c = RankedCounter('ABCDGRIOGGHAJHNVUSBHAGYCDRSAA')
+    print(c.most_common(3))
+    print(collections.Counter('ABCDGRIOGGHAJHNVUSBHAGYCDRSAA').most_common(3))
+
+    c.update('HHH')
+    c.subtract({'A': 4})
+    del c['G']
+    print(c.most_common(3))
+    print('levels :', c._levels)
+    print('buckets:', c._buckets[c._levels[-1]])
@@ -0,0 +1,51 @@
+# collections_counter_ranked_benchmark.py
+
+import collections
+import random
+import sys
+import time
+
+from collections_counter_ranked import RankedCounter
+
+
+def poll_latency(counter, n, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        counter.most_common(n)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def events(count, keys):
+    random.seed(2016)
+    return ['key{}'.format(int(keys ** random.random()))
+            for _ in range(count)]
+
+
+num_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+initial = events(num_keys * 3, num_keys)
+
+print('{:<14} {:>11} {:>14} {:>14} {:>16}'.format(
+    'counter', 'keys', 'build(s)', 'poll top10', 'update 10k(ms)'))
+for cls in (collections.Counter, RankedCounter):
+    start = time.perf_counter()
+    c = cls(initial)
+    build = time.perf_counter() - start
+    poll = poll_latency(c, 10, 3 if cls is collections.Counter else 1000)
+    more = events(10000, num_keys)
+    start = time.perf_counter()
+    c.update(more)
+    c.subtract(more[:5000])
+    update = (time.perf_counter() - start) * 1000
+    print('{:<14} {:>11,} {:>14.2f} {:>11.3f} ms {:>16.1f}'.format(
+        cls.__name__, len(c), build, poll, update))
+
+# 从映射构造和更新(copy()和pickle也经过这条路径)
+counts = dict(collections.Counter(initial))
+print('\nfrom a dict:')
+for cls in (collections.Counter, RankedCounter):
+    start = time.perf_counter()
+    c = cls(counts)
+    c.update(counts)
+    build = time.perf_counter() - start
+    print('{:<14} {:>11,} {:>14.2f}   top3 {}'.format(
+        cls.__name__, len(c), build, c.most_common(3)))
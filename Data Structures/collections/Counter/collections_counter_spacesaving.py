@@ -0,0 +1,114 @@
+# collections_counter_spacesaving.py
+
+import collections
+import collections.abc
+import heapq
+import itertools
+import operator
+
+
+class SpaceSavingCounter:
+    """内存有界的近似计数器(Space-Saving算法)
+
+    最多跟踪capacity个键。计数器满了以后遇到新键时，替换当前计数最小的键，
+    新键继承它的计数加一，被继承的部分记为这个键的误差。
+    对于每个被跟踪的键，真实计数在[count - error, count]之间；
+    任何键的高估量都不超过total / capacity。
+    """
+
+    def __init__(self, capacity=1000, iterable=None, **kwds):
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}   # key -> [count, error]
+        # (count, 序号, key)，计数可能已经过期；计数相同时按序号比较，
+        # 不比较键，所以键可以是不能互相比较的类型
+        self._heap = []
+        self._order = itertools.count()
+        self.update(iterable, **kwds)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, key):
+        return key in self._counts
+
+    def __getitem__(self, key):
+        entry = self._counts.get(key)
+        return entry[0] if entry else 0
+
+    def error(self, key):
+        entry = self._counts.get(key)
+        return entry[1] if entry else self.min_count()
+
+    def min_count(self):
+        """没有被跟踪的键的计数上限"""
+        if len(self._counts) < self.capacity:
+            return 0
+        return self._pop_min(remove=False)[0]
+
+    def _pop_min(self, remove=True):
+        heap, counts = self._heap, self._counts
+        while True:
+            count, _, key = heap[0]
+            current = counts[key][0]
+            if current == count:
+                if remove:
+                    heapq.heappop(heap)
+                return count, key
+            # 过期的条目：换成当前的计数
+            heapq.heapreplace(heap, (current, next(self._order), key))
+
+    def add(self, key, count=1):
+        self.total += count
+        entry = self._counts.get(key)
+        if entry is not None:
+            entry[0] += count
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[key] = [count, 0]
+            heapq.heappush(self._heap, (count, next(self._order), key))
+            return
+        min_count, min_key = self._pop_min()
+        del self._counts[min_key]
+        self._counts[key] = [min_count + count, min_count]
+        heapq.heappush(self._heap,
+                       (min_count + count, next(self._order), key))
+
+    def update(self, iterable=None, **kwds):
+        if iterable is not None:
+            if isinstance(iterable, collections.abc.Mapping):
+                for key, count in iterable.items():
+                    self.add(key, count)
+            else:
+                for key in iterable:
+                    self.add(key)
+        for key, count in kwds.items():
+            self.add(key, count)
+
+    def most_common(self, n=None):
+        items = ((key, entry[0]) for key, entry in self._counts.items())
+        if n is None:
+            return sorted(items, key=operator.itemgetter(1), reverse=True)
+        return heapq.nlargest(n, items, key=operator.itemgetter(1))
+
+    def elements(self):
+        return itertools.chain.from_iterable(
+            itertools.repeat(key, entry[0])
+            for key, entry in self._counts.items())
+
+    def __repr__(self):
+        return '{}({}, total={})'.format(
+            type(self).__name__, dict(self.most_common()), self.total)
+
+
+if __name__ == '__main__':
+    text = 'ABCDGRIOGGHAJHNVUSBHAGYCDRSAA'
+    exact = collections.Counter(text)
+    approx = SpaceSavingCounter(10, text)
+    print('exact :', exact.most_common(3))
+    print('approx:', approx.most_common(3))
+    print('bound : total / capacity =', approx.total / approx.capacity)
+    for key, count in approx.most_common(3):
+        print('{}: {} <= true count {} <= {}'.format(
+            key, count - approx.error(key), exact[key], count))
+    print(''.join(sorted(approx.elements())))
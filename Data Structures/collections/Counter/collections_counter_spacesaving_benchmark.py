@@ -0,0 +1,54 @@
+# collections_counter_spacesaving_benchmark.py
+
+import collections
+import itertools
+import random
+import sys
+import time
+import tracemalloc
+
+from collections_counter_spacesaving import SpaceSavingCounter
+
+K = 100
+
+
+def zipf_stream(n, keys, s=1.1):
+    random.seed(2016)
+    cum_weights = list(itertools.accumulate(
+        1 / (i + 1) ** s for i in range(keys)))
+    return random.choices(range(keys), cum_weights=cum_weights, k=n)
+
+
+def measure(factory, stream):
+    tracemalloc.start()
+    start = time.perf_counter()
+    counter = factory()
+    # 像用户ID或URL一样，每个事件都带来一个新的字符串
+    counter.update('user{}'.format(i) for i in stream)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return counter, elapsed, size
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+stream = zipf_stream(n, n)
+print('{:,} events, Zipf(1.1)'.format(n))
+
+exact, elapsed, size = measure(collections.Counter, stream)
+exact_top = exact.most_common(K)
+print('{:<20} {:>9} {:>10} {:>10} {:>11} {:>10}'.format(
+    'counter', 'keys', 'memory', 'time(s)', 'top-100 hit', 'max error'))
+print('{:<20} {:>9,} {:>8.1f}MB {:>10.2f} {:>11} {:>10}'.format(
+    'Counter', len(exact), size / 1024 / 1024, elapsed, '100%', 0))
+
+for capacity in (200, 1000, 10000):
+    approx, elapsed, size = measure(
+        lambda: SpaceSavingCounter(capacity), stream)
+    approx_keys = {key for key, _ in approx.most_common(K)}
+    hits = sum(1 for key, _ in exact_top if key in approx_keys)
+    max_error = max(approx[key] - count for key, count in exact_top)
+    print('{:<20} {:>9,} {:>8.1f}MB {:>10.2f} {:>10}% {:>10,}'.format(
+        'SpaceSaving({})'.format(capacity), len(approx),
+        size / 1024 / 1024, elapsed, hits, max_error))
+    assert max_error <= approx.total / capacity
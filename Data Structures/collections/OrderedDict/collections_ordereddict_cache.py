@@ -0,0 +1,248 @@
+# collections_ordereddict_cache.py
+
+import collections
+import collections.abc
+import heapq
+import itertools
+import threading
+import time
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', 'hits misses evictions expirations currsize weight')
+
+
+class Cache(collections.abc.MutableMapping):
+    """线程安全的LRU/LFU缓存
+
+    maxsize限制条目的个数；maxweight限制sizer(value)的总和；
+    ttl是默认的存活时间(秒)，也可以在set()中为每个条目单独指定。
+    LRU模式下条目按最近访问的顺序保存在一个OrderedDict中，
+    命中时用move_to_end()移到末尾，淘汰时从头部弹出。
+    LFU模式下按访问次数分组，每组是一个OrderedDict，
+    同样次数的条目中淘汰最久没有访问的。
+    """
+
+    def __init__(self, maxsize=128, maxweight=None, sizer=None, ttl=None,
+                 policy='lru', clock=time.monotonic):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError('policy must be "lru" or "lfu"')
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        if maxweight is not None and sizer is None:
+            raise ValueError('maxweight requires a sizer')
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self.sizer = sizer
+        self.ttl = ttl
+        self.policy = policy
+        self.clock = clock
+        # key -> [值, 权重, 过期时间, 访问次数]
+        self._data = collections.OrderedDict()
+        self._freqs = {}        # LFU：次数 -> OrderedDict(key -> None)
+        self._min_freq = 0
+        self._weight = 0
+        # (过期时间, 序号, key)；条目被删除或覆盖后，堆中旧的记录在弹出时跳过
+        self._expiry = []
+        self._order = itertools.count()
+        self._hits = self._misses = 0
+        self._evictions = self._expirations = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            self.expire()
+            return len(self._data)
+
+    def __iter__(self):
+        with self._lock:
+            self.expire()
+            return iter(list(self._data))
+
+    # 继承的items()和values()通过__getitem__取值，会计入命中并改变条目的
+    # 顺序；这里直接读取_data，返回不包括过期条目的快照
+    def items(self):
+        with self._lock:
+            self.expire()
+            return [(key, entry[0]) for key, entry in self._data.items()]
+
+    def values(self):
+        with self._lock:
+            self.expire()
+            return [entry[0] for entry in self._data.values()]
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._expired(key, entry)
+
+    def __getitem__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(key, entry):
+                self._misses += 1
+                raise KeyError(key)
+            self._hits += 1
+            self._touch(key, entry)
+            return entry[0]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def set(self, key, value, ttl=None):
+        weight = self.sizer(value) if self.sizer else 0
+        if self.maxweight is not None and weight > self.maxweight:
+            raise ValueError('value is larger than maxweight')
+        ttl = self.ttl if ttl is None else ttl
+        expires = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._weight += weight - entry[1]
+                entry[0:3] = [value, weight, expires]
+                self._touch(key, entry)
+            else:
+                self._data[key] = [value, weight, expires, 1]
+                self._weight += weight
+                if self.policy == 'lfu':
+                    self._freqs.setdefault(1, collections.OrderedDict())[
+                        key] = None
+                    self._min_freq = 1
+            while (len(self._data) > self.maxsize or
+                   self.maxweight is not None and
+                   self._weight > self.maxweight):
+                self._evict(exclude=key)
+            if expires is not None:
+                heapq.heappush(self._expiry,
+                               (expires, next(self._order), key))
+                if len(self._expiry) > 2 * len(self._data) + 64:
+                    self._compact_expiry()
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _touch(self, key, entry):
+        if self.policy == 'lru':
+            self._data.move_to_end(key)
+            return
+        freq = entry[3]
+        bucket = self._freqs[freq]
+        del bucket[key]
+        if not bucket:
+            del self._freqs[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        entry[3] = freq + 1
+        self._freqs.setdefault(freq + 1, collections.OrderedDict())[
+            key] = None
+
+    def _remove(self, key):
+        value, weight, expires, freq = self._data.pop(key)
+        self._weight -= weight
+        if self.policy == 'lfu':
+            bucket = self._freqs[freq]
+            del bucket[key]
+            if not bucket:
+                del self._freqs[freq]
+        return value
+
+    def _expired(self, key, entry):
+        if entry[2] is None or entry[2] > self.clock():
+            return False
+        self._remove(key)
+        self._expirations += 1
+        return True
+
+    def _evict(self, exclude):
+        """按策略淘汰一个条目，但不淘汰刚写入的exclude"""
+        if self.policy == 'lru':
+            bucket = self._data
+        else:
+            freqs = self._freqs
+            if self._min_freq not in freqs:
+                self._min_freq = min(freqs)
+            bucket = freqs[self._min_freq]
+            if len(bucket) == 1 and exclude in bucket:
+                bucket = freqs[min(f for f in freqs if f != self._min_freq)]
+        keys = iter(bucket)
+        key = next(keys)
+        if key == exclude:
+            key = next(keys)
+        entry = self._data[key]
+        if not self._expired(key, entry):
+            self._remove(key)
+            self._evictions += 1
+
+    def expire(self):
+        """删除所有已经过期的条目
+
+        只从过期时间的堆中弹出已经到期的记录，开销与到期的条目数成正比，
+        所以len()和迭代每次调用它也不必扫描整个缓存。
+        """
+        with self._lock:
+            now = self.clock()
+            heap, data = self._expiry, self._data
+            while heap and heap[0][0] <= now:
+                expires, _, key = heapq.heappop(heap)
+                entry = data.get(key)
+                if entry is not None and entry[2] == expires:
+                    self._expired(key, entry)
+
+    def _compact_expiry(self):
+        """丢弃堆中作废的记录，避免频繁覆盖的键使堆无限增长"""
+        self._expiry = [(entry[2], next(self._order), key)
+                        for key, entry in self._data.items()
+                        if entry[2] is not None]
+        heapq.heapify(self._expiry)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._freqs.clear()
+            self._expiry.clear()
+            self._weight = 0
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self._expirations, len(self._data),
+                             self._weight)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, dict(self.items()))
+
+
+if __name__ == '__main__':
+    lru = Cache(maxsize=3)
+    for key in 'abc':
+        lru[key] = key.upper()
+    lru['a']
+    lru['d'] = 'D'
+    print('LRU:', lru)
+
+    lfu = Cache(maxsize=3, policy='lfu')
+    for key in 'abc':
+        lfu[key] = key.upper()
+    lfu['a'], lfu['a'], lfu['c']
+    lfu['d'] = 'D'
+    print('LFU:', lfu)
+
+    sized = Cache(maxsize=100, maxweight=10, sizer=len)
+    for word in ['apple', 'fig', 'kiwi', 'banana']:
+        sized[word] = word
+    print('\nmaxweight=10:', list(sized),
+          'weight =', sized.cache_info().weight)
+
+    now = [0]
+    ttl = Cache(ttl=10, clock=lambda: now[0])
+    ttl['session'] = 'abc'
+    ttl.set('token', 'xyz', ttl=60)
+    now[0] = 30
+    print('\nafter 30s:', ttl.get('session'), ttl.get('token'))
+    print(ttl.cache_info())
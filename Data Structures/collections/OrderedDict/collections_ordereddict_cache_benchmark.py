@@ -0,0 +1,50 @@
+# collections_ordereddict_cache_benchmark.py
+
+import random
+import sys
+import threading
+import time
+
+from collections_ordereddict_cache import Cache
+
+
+def worker(cache, keys, results):
+    hits = 0
+    for key in keys:
+        value = cache.get(key)
+        if value is None:
+            cache[key] = key
+        else:
+            hits += 1
+    results.append(hits)
+
+
+def run(cache, threads, operations, num_keys):
+    random.seed(2016)
+    # 近似Zipf分布的访问：少数键被频繁访问
+    streams = [[int(num_keys ** random.random()) for _ in range(operations)]
+               for _ in range(threads)]
+    results = []
+    workers = [threading.Thread(target=worker, args=(cache, s, results))
+               for s in streams]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return threads * operations / elapsed, sum(results) / (threads *
+                                                           operations)
+
+
+operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+num_keys = 100000
+
+print('{:<6} {:>8} {:>14} {:>10}'.format(
+    'policy', 'threads', 'ops/s', 'hit rate'))
+for policy in ('lru', 'lfu'):
+    for threads in (1, 2, 4, 8):
+        cache = Cache(maxsize=1000, policy=policy)
+        ops, hit_rate = run(cache, threads, operations // threads, num_keys)
+        print('{:<6} {:>8} {:>14,.0f} {:>9.1%}'.format(
+            policy, threads, ops, hit_rate))
@@ -0,0 +1,165 @@
+# collections_defaultdict_tree.py
+
+import array
+import itertools
+
+
+class GroupTree:
+    """多层分组聚合的树，代替defaultdict(lambda: defaultdict(list))
+
+    内部节点是普通的dict，叶子直接保存在最后一层的dict中：
+    指定typecode时叶子是array.array，指定reducer时叶子是累计的值，
+    否则是list。相同的键只保存一个对象。树中没有lambda，可以直接pickle。
+    """
+
+    def __init__(self, levels, typecode=None, reducer=None, initial=0):
+        if typecode is not None and reducer is not None:
+            raise ValueError('typecode and reducer are mutually exclusive')
+        self.levels = tuple(levels)
+        self.typecode = typecode
+        self.reducer = reducer
+        self.initial = initial
+        self.root = {}
+        self._keys = {}     # 共享相同的键对象
+
+    def _level(self, level):
+        if isinstance(level, str):
+            return self.levels.index(level) + 1
+        return level
+
+    def add(self, path, value):
+        if len(path) != len(self.levels):
+            raise ValueError('expected a path of {} keys'.format(
+                len(self.levels)))
+        keys = self._keys
+        node = self.root
+        for key in path[:-1]:
+            child = node.get(key)
+            if child is None:
+                child = node[keys.setdefault(key, key)] = {}
+            node = child
+        key = path[-1]
+        if self.reducer is not None:
+            leaf = node.get(key, self.initial)
+            node[keys.setdefault(key, key)] = self.reducer(leaf, value)
+            return
+        leaf = node.get(key)
+        if leaf is None:
+            leaf = node[keys.setdefault(key, key)] = (
+                array.array(self.typecode) if self.typecode else [])
+        leaf.append(value)
+
+    def __getitem__(self, prefix):
+        """返回前缀对应的子树(dict)或者叶子"""
+        node = self.root
+        for key in prefix:
+            node = node[key]
+        return node
+
+    def items(self, prefix=()):
+        """按插入顺序产生前缀下的所有(路径, 叶子)"""
+        prefix = tuple(prefix)
+        node = self[prefix]
+        depth = len(self.levels) - len(prefix)
+        if depth == 0:
+            yield prefix, node
+            return
+        stack = [(prefix, iter(node.items()))]
+        while stack:
+            path, children = stack[-1]
+            for key, child in children:
+                if len(path) + 1 == len(self.levels):
+                    yield path + (key,), child
+                else:
+                    stack.append((path + (key,), iter(child.items())))
+                    break
+            else:
+                stack.pop()
+
+    def values(self, prefix=()):
+        """前缀下所有叶子中的值"""
+        leaves = (leaf for _, leaf in self.items(prefix))
+        if self.reducer is not None:
+            return leaves
+        return itertools.chain.from_iterable(leaves)
+
+    def aggregate(self, level, func=sum, prefix=()):
+        """按level层的分组对值调用func，返回{分组的路径: 结果}
+
+        level可以是层的名称或者层数(1表示第一层)。
+        """
+        level = self._level(level)
+        prefix = tuple(prefix)
+        if not len(prefix) <= level <= len(self.levels):
+            raise ValueError('level is outside the prefix and the leaves')
+        if level == len(prefix):
+            return {prefix: func(self.values(prefix))}
+        result = {}
+        for path, _ in self._nodes(prefix, level):
+            result[path] = func(self.values(path))
+        return result
+
+    def _nodes(self, prefix, level):
+        nodes = [(prefix, self[prefix])]
+        for _ in range(level - len(prefix)):
+            nodes = [(path + (key,), child)
+                     for path, node in nodes
+                     for key, child in node.items()]
+        return nodes
+
+    def rollup(self, funcs):
+        """对每一层分别聚合，funcs是{层: 函数}"""
+        return {level: self.aggregate(level, func)
+                for level, func in funcs.items()}
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+    def __getstate__(self):
+        # _keys只用于写入时去重，可以根据树重建
+        state = self.__dict__.copy()
+        del state['_keys']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._keys = {}
+        for path, _ in self.items():
+            for key in path:
+                self._keys.setdefault(key, key)
+
+
+if __name__ == '__main__':
+    import operator
+    import pickle
+    import statistics
+
+    sales = [
+        ('east', 'apple', 'mon', 3.0),
+        ('east', 'apple', 'tue', 5.0),
+        ('east', 'pear', 'mon', 2.0),
+        ('west', 'apple', 'mon', 7.0),
+        ('west', 'fig', 'tue', 1.0),
+        ('east', 'apple', 'mon', 4.0),
+    ]
+    tree = GroupTree(['region', 'product', 'day'], typecode='d')
+    for *path, amount in sales:
+        tree.add(path, amount)
+
+    print('east/apple:', tree['east', 'apple'])
+    print('\nprefix ("west",):')
+    for path, leaf in tree.items(['west']):
+        print('  ', path, leaf.tolist())
+    print('\nby region :', tree.aggregate('region'))
+    print('max by product:', tree.aggregate('product', max))
+    print('mean by day in east:',
+          tree.aggregate('day', statistics.mean, prefix=['east']))
+
+    totals = GroupTree(['region', 'product'], reducer=operator.add)
+    for region, product, day, amount in sales:
+        totals.add((region, product), amount)
+    print('\nreducer:', totals.root)
+    print(totals.rollup({'region': sum, 2: max}))
+
+    copy = pickle.loads(pickle.dumps(tree))
+    print('\nunpickled:', copy.aggregate('region'), len(copy))
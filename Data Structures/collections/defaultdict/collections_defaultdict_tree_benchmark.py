@@ -0,0 +1,66 @@
+# collections_defaultdict_tree_benchmark.py
+
+import collections
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+from collections_defaultdict_tree import GroupTree
+
+
+def rows(count):
+    random.seed(2016)
+    for _ in range(count):
+        # 键来自解析后的文本，每一行都是新的字符串对象
+        line = 'region{},product{},day{},{}'.format(
+            random.randrange(10), random.randrange(500),
+            random.randrange(30), random.random() * 100)
+        region, product, day, amount = line.split(',')
+        yield region, product, day, float(amount)
+
+
+def nested(count):
+    groups = collections.defaultdict(
+        lambda: collections.defaultdict(
+            lambda: collections.defaultdict(list)))
+    for region, product, day, amount in rows(count):
+        groups[region][product][day].append(amount)
+    return groups
+
+
+def tree(count):
+    groups = GroupTree(['region', 'product', 'day'], typecode='d')
+    for region, product, day, amount in rows(count):
+        groups.add((region, product, day), amount)
+    return groups
+
+
+def measure(build, count):
+    start = time.perf_counter()
+    build(count)
+    elapsed = time.perf_counter() - start
+    # tracemalloc会拖慢构建，所以另外构建一次来统计内存
+    tracemalloc.start()
+    groups = build(count)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    try:
+        start = time.perf_counter()
+        data = pickle.dumps(groups, protocol=pickle.HIGHEST_PROTOCOL)
+        dumped = '{:.1f}MB in {:.2f}s'.format(
+            len(data) / 2 ** 20, time.perf_counter() - start)
+    except (pickle.PicklingError, AttributeError) as err:
+        dumped = type(err).__name__
+    return elapsed, memory, dumped
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+print('{:<12} {:>10} {:>10}  {}'.format(
+    'structure', 'build(s)', 'memory', 'pickle'))
+for name, build in [('defaultdict', nested), ('GroupTree', tree)]:
+    elapsed, memory, dumped = measure(build, count)
+    print('{:<12} {:>10.2f} {:>8.1f}MB  {}'.format(
+        name, elapsed, memory / 2 ** 20, dumped))
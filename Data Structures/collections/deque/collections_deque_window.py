@@ -0,0 +1,121 @@
+# collections_deque_window.py
+
+import collections
+import itertools
+import math
+import time
+
+
+class SlidingWindow:
+    """在滑动窗口上以均摊O(1)的开销维护总和、均值、方差、最小值和最大值
+
+    窗口可以按元素个数(size)、按时间(duration)或者同时按两者限制。
+    """
+
+    def __init__(self, size=None, duration=None, clock=time.monotonic):
+        if size is None and duration is None:
+            raise ValueError('size or duration is required')
+        self.size = size
+        self.duration = duration
+        self.clock = clock
+        self._items = collections.deque()   # (序号, 时间, 值)
+        self._mins = collections.deque()    # 值单调递增的(序号, 值)
+        self._maxes = collections.deque()   # 值单调递减的(序号, 值)
+        self._seq = itertools.count()
+        self._mean = 0.0
+        self._m2 = 0.0      # 与均值之差的平方和(Welford算法)
+        self.sum = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def append(self, value, timestamp=None):
+        if timestamp is None and self.duration is not None:
+            timestamp = self.clock()
+        seq = next(self._seq)
+        self._items.append((seq, timestamp, value))
+        self.sum += value
+        n = len(self._items)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+
+        # 新值比队尾的值更小，那些值永远不会再成为最小值
+        mins = self._mins
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((seq, value))
+        maxes = self._maxes
+        while maxes and maxes[-1][1] <= value:
+            maxes.pop()
+        maxes.append((seq, value))
+
+        if self.size is not None and n > self.size:
+            self._evict()
+        if self.duration is not None:
+            self.expire(timestamp)
+
+    def expire(self, now=None):
+        """丢弃超出时间窗口的元素"""
+        if now is None:
+            now = self.clock()
+        items = self._items
+        while items and now - items[0][1] > self.duration:
+            self._evict()
+
+    def _evict(self):
+        seq, timestamp, value = self._items.popleft()
+        self.sum -= value
+        n = len(self._items)
+        if n:
+            delta = value - self._mean
+            self._mean -= delta / n
+            self._m2 -= delta * (value - self._mean)
+        else:
+            self._mean = self._m2 = 0.0
+        if self._mins[0][0] == seq:
+            self._mins.popleft()
+        if self._maxes[0][0] == seq:
+            self._maxes.popleft()
+
+    @property
+    def mean(self):
+        return self._mean if self._items else math.nan
+
+    @property
+    def variance(self):
+        """总体方差"""
+        n = len(self._items)
+        return max(self._m2, 0.0) / n if n else math.nan
+
+    @property
+    def min(self):
+        return self._mins[0][1]
+
+    @property
+    def max(self):
+        return self._maxes[0][1]
+
+
+if __name__ == '__main__':
+    import random
+
+    # 设置random seed这样每次执行都是相同结果
+    random.seed(1)
+
+    w = SlidingWindow(size=3)
+    for i in range(5):
+        n = random.randint(0, 100)
+        w.append(n)
+        print('n = {:>3}  window: {!s:<14} sum={:<4} mean={:<6.2f} '
+              'var={:<8.2f} min={:<3} max={}'.format(
+                  n, [v for _, _, v in w._items], w.sum, w.mean,
+                  w.variance, w.min, w.max))
+
+    # 按时间限制：只保留最近10秒内的请求
+    now = [0]
+    requests = SlidingWindow(duration=10, clock=lambda: now[0])
+    for t in [0, 1, 2, 8, 12, 13, 25]:
+        now[0] = t
+        requests.append(1)
+        print('t = {:>2}  requests in last 10s: {}'.format(t, requests.sum))
@@ -0,0 +1,53 @@
+# collections_deque_window_benchmark.py
+
+import collections
+import random
+import statistics
+import sys
+import time
+
+from collections_deque_window import SlidingWindow
+
+
+def naive(d, values, with_variance):
+    # 每次append以后都在整个窗口上重新计算
+    for v in values:
+        d.append(v)
+        sum(d), min(d), max(d)
+        if with_variance:
+            statistics.pvariance(d)
+
+
+def incremental(w, values):
+    for v in values:
+        w.append(v)
+        w.sum, w.min, w.max, w.variance
+
+
+def rate(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return len(args[1]) / (time.perf_counter() - start)
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+random.seed(2016)
+values = [random.gauss(100, 15) for _ in range(n)]
+
+print('{:>8} {:>18} {:>18} {:>18}'.format(
+    'window', 'recompute', 'recompute(no var)', 'SlidingWindow'))
+for size in (10, 100, 1000, 10000):
+    # 先填满窗口，只测量窗口满了以后的开销
+    prefill, rest = values[:size], values[size:]
+    # 逐个重新计算太慢，只用一部分数据测量
+    sample = rest[:max(n * 10 // size, 1000)]
+
+    d = collections.deque(prefill, maxlen=size)
+    with_var = rate(naive, d, sample[:max(len(sample) // 20, 100)], True)
+    d = collections.deque(prefill, maxlen=size)
+    without_var = rate(naive, d, sample, False)
+    w = SlidingWindow(size=size)
+    for v in prefill:
+        w.append(v)
+    print('{:>8} {:>13,.0f} ev/s {:>13,.0f} ev/s {:>13,.0f} ev/s'.format(
+        size, with_var, without_var, rate(incremental, w, rest)))
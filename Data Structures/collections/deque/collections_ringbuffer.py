@@ -0,0 +1,142 @@
+# collections_ringbuffer.py
+
+import queue
+import threading
+import time
+
+
+class RingBuffer:
+    """预先分配好的有界环形缓冲区，满了以后的行为由policy决定
+
+    policy为'block'时put()等待空间，'drop_oldest'时覆盖最旧的元素
+    (与deque(maxlen=...)相同，但会计数)，'drop_newest'时丢弃新元素。
+    """
+
+    POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+    def __init__(self, capacity, policy='block'):
+        if policy not in self.POLICIES:
+            raise ValueError('unknown policy {!r}'.format(policy))
+        self.capacity = capacity
+        self.policy = policy
+        self._items = [None] * capacity
+        self._head = 0      # 下一个要取出的位置
+        self._count = 0
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self.put_count = 0
+        self.get_count = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+
+    def __len__(self):
+        return self._count
+
+    def put(self, item, block=True, timeout=None):
+        """放入一个元素，元素被丢弃时返回False"""
+        with self._not_full:
+            if self._count == self.capacity:
+                if self.policy == 'drop_newest':
+                    self.dropped_newest += 1
+                    return False
+                if self.policy == 'drop_oldest':
+                    self._head = (self._head + 1) % self.capacity
+                    self._count -= 1
+                    self.dropped_oldest += 1
+                elif not block:
+                    raise queue.Full
+                elif not self._not_full.wait_for(
+                        lambda: self._count < self.capacity, timeout):
+                    raise queue.Full
+            tail = (self._head + self._count) % self.capacity
+            self._items[tail] = item
+            self._count += 1
+            self.put_count += 1
+            self._not_empty.notify()
+            return True
+
+    def put_nowait(self, item):
+        return self.put(item, block=False)
+
+    def get(self, block=True, timeout=None):
+        with self._not_empty:
+            if not self._count:
+                if not block:
+                    raise queue.Empty
+                if not self._not_empty.wait_for(
+                        lambda: self._count, timeout):
+                    raise queue.Empty
+            item = self._items[self._head]
+            self._items[self._head] = None
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self.get_count += 1
+            self._not_full.notify()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def drain(self, max_items=None, block=True, timeout=None):
+        """一次取出最多max_items个元素，只需要获取一次锁"""
+        with self._not_empty:
+            if not self._count and block:
+                self._not_empty.wait_for(lambda: self._count, timeout)
+            n = self._count if max_items is None else min(
+                max_items, self._count)
+            start = self._head
+            end = start + n
+            if end <= self.capacity:
+                batch = self._items[start:end]
+                self._items[start:end] = [None] * n
+            else:
+                end -= self.capacity
+                batch = self._items[start:] + self._items[:end]
+                self._items[start:] = [None] * (self.capacity - start)
+                self._items[:end] = [None] * end
+            self._head = end % self.capacity
+            self._count -= n
+            self.get_count += n
+            self._not_full.notify(n)
+            return batch
+
+    def stats(self):
+        with self._lock:
+            return {
+                'put': self.put_count,
+                'get': self.get_count,
+                'dropped_oldest': self.dropped_oldest,
+                'dropped_newest': self.dropped_newest,
+                'size': self._count,
+            }
+
+
+if __name__ == '__main__':
+    for policy in RingBuffer.POLICIES[1:]:
+        ring = RingBuffer(3, policy)
+        for i in range(5):
+            ring.put(i)
+        print('{:<12} drain: {} stats: {}'.format(
+            policy, ring.drain(), ring.stats()))
+
+    # 'block'：生产者等待消费者腾出空间，不会丢失数据
+    ring = RingBuffer(3)
+
+    def produce():
+        for i in range(10):
+            ring.put(i)
+        ring.put(None)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    received = []
+    while True:
+        time.sleep(0.01)
+        batch = ring.drain()
+        received.extend(batch)
+        if batch and batch[-1] is None:
+            break
+    producer.join()
+    print('block        received:', received[:-1])
+    print('             stats:', ring.stats())
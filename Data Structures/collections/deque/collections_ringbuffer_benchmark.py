@@ -0,0 +1,101 @@
+# collections_ringbuffer_benchmark.py
+
+import collections
+import queue
+import sys
+import threading
+import time
+
+from collections_ringbuffer import RingBuffer
+
+STOP = object()
+
+
+def run(label, put, consume, producers, consumers, n):
+    per_producer = n // producers
+
+    def produce():
+        for i in range(per_producer):
+            put(i)
+
+    counts = []
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    workers = [threading.Thread(target=lambda: counts.append(consume()))
+               for _ in range(consumers)]
+    start = time.perf_counter()
+    for t in threads + workers:
+        t.start()
+    for t in threads:
+        t.join()
+    for _ in workers:
+        put(STOP)
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    received = sum(counts)
+    print('{:<26} {:>10,.0f} items/s  lost {:>7,}'.format(
+        label, received / elapsed, per_producer * producers - received))
+
+
+def with_queue(capacity):
+    q = queue.Queue(capacity)
+
+    def consume():
+        count = 0
+        while q.get() is not STOP:
+            count += 1
+        return count
+    return q.put, consume
+
+
+def with_deque(capacity):
+    # deque没有阻塞操作，消费者只能轮询；maxlen满了会悄悄丢掉旧数据
+    d = collections.deque(maxlen=capacity)
+
+    def consume():
+        count = 0
+        while True:
+            try:
+                item = d.popleft()
+            except IndexError:
+                time.sleep(0)
+                continue
+            if item is STOP:
+                return count
+            count += 1
+    return d.append, consume
+
+
+def with_ring(capacity, batch):
+    ring = RingBuffer(capacity)
+
+    def consume():
+        count = 0
+        while True:
+            if batch:
+                items = ring.drain(batch)
+            else:
+                items = [ring.get()]
+            for i, item in enumerate(items):
+                if item is STOP:
+                    # STOP之后只有STOP，把多取的还给其他消费者
+                    for _ in items[i + 1:]:
+                        ring.put(STOP)
+                    return count
+                count += 1
+    return ring.put, consume
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 400000
+capacity = 1024
+for producers, consumers in [(1, 1), (4, 4)]:
+    print('{} producers, {} consumers, {:,} items'.format(
+        producers, consumers, n))
+    cases = [
+        ('queue.Queue', with_queue(capacity)),
+        ('deque(maxlen)', with_deque(capacity)),
+        ('RingBuffer get()', with_ring(capacity, 0)),
+        ('RingBuffer drain(256)', with_ring(capacity, 256)),
+    ]
+    for label, (put, consume) in cases:
+        run(label, put, consume, producers, consumers, n)
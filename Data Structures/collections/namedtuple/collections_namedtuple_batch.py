@@ -0,0 +1,207 @@
+# collections_namedtuple_batch.py
+
+import array
+import collections
+import itertools
+
+# 根据typing.NamedTuple的类型注解选择array的typecode
+TYPECODES = {int: 'q', float: 'd', bool: 'b'}
+
+
+class RecordBatch:
+    """按列保存记录：有typecode的字段用array.array，其他字段用列表
+
+    由record_batch()为每个namedtuple类型生成子类。切片返回共享同一组列的
+    视图，不复制数据。
+    """
+
+    record_type = None
+    typecodes = {}
+
+    def __init__(self, rows=(), _columns=None, _start=0, _stop=None):
+        if _columns is None:
+            _columns = {
+                name: array.array(self.typecodes[name])
+                if name in self.typecodes else []
+                for name in self.record_type._fields
+            }
+        self._columns = _columns
+        self._start = _start
+        self._stop = _stop
+        if rows:
+            self.extend(rows)
+
+    def __len__(self):
+        stop = self._stop
+        if stop is None:
+            stop = len(self._columns[self.record_type._fields[0]])
+        return stop - self._start
+
+    def _check_writable(self):
+        if self._stop is not None or self._start:
+            raise TypeError('cannot append to a slice of a RecordBatch')
+
+    def append(self, row):
+        self._check_writable()
+        self._add(self._stage([row]))
+
+    def extend(self, rows):
+        self._check_writable()
+        self._add(self._stage(rows))
+
+    def _stage(self, rows):
+        """先把新的行按列放入临时的数组和列表，类型不符的值在这里引发异常"""
+        fields = self.record_type._fields
+        staged = [array.array(self.typecodes[name])
+                  if name in self.typecodes else []
+                  for name in fields]
+        for row in rows:
+            if len(row) != len(fields):
+                raise ValueError('expected {} fields, got {}'.format(
+                    len(fields), len(row)))
+            for values, value in zip(staged, row):
+                values.append(value)
+        return staged
+
+    def _add(self, staged):
+        """把暂存的列接到每一列的末尾，失败时所有的列都保持原来的长度"""
+        columns = list(self._columns.values())
+        done = []
+        try:
+            # 只有数组会因为导出的缓冲区而不能改变大小，所以先处理数组
+            for column, values in zip(columns, staged):
+                if isinstance(column, array.array):
+                    column.extend(values)
+                    done.append((column, len(values)))
+        except BufferError:
+            for column, count in done:
+                del column[len(column) - count:]
+            raise
+        for column, values in zip(columns, staged):
+            if not isinstance(column, array.array):
+                column.extend(values)
+
+    def column(self, name):
+        """返回一列数据；数组列返回memoryview，不复制
+
+        memoryview释放之前数组不能改变大小，append()和extend()会引发
+        BufferError，所以应当用with语句或者release()及时释放。
+        """
+        column = self._columns[name]
+        stop = self._start + len(self)
+        if isinstance(column, array.array):
+            return memoryview(column)[self._start:stop]
+        if self._start == 0 and stop == len(column):
+            return column
+        return column[self._start:stop]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError('slice step is not supported')
+            return type(self)(_columns=self._columns,
+                              _start=self._start + start,
+                              _stop=self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('record index out of range')
+        return self.Row(self, self._start + index)
+
+    def __iter__(self):
+        Row = self.Row
+        for i in range(self._start, self._start + len(self)):
+            yield Row(self, i)
+
+    def iter_tuples(self):
+        """按行产生namedtuple，只在需要时创建对象"""
+        stop = self._start + len(self)
+        columns = [itertools.islice(c, self._start, stop)
+                   for c in self._columns.values()]
+        return map(self.record_type._make, zip(*columns))
+
+    def where(self, name, predicate):
+        """按一列的条件过滤，返回一个新的RecordBatch"""
+        mask = list(map(predicate, self.column(name)))
+        columns = {}
+        for field in self.record_type._fields:
+            selected = itertools.compress(self.column(field), mask)
+            if field in self.typecodes:
+                columns[field] = array.array(self.typecodes[field], selected)
+            else:
+                columns[field] = list(selected)
+        return type(self)(_columns=columns)
+
+
+class RowView:
+    """一行的视图，只保存批次和行号"""
+
+    __slots__ = ('_batch', '_index')
+
+    def __init__(self, batch, index):
+        self._batch = batch
+        self._index = index
+
+    def _astuple(self):
+        i = self._index
+        return self._batch.record_type._make(
+            c[i] for c in self._batch._columns.values())
+
+    def _asdict(self):
+        return self._astuple()._asdict()
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self._astuple())
+
+
+def record_batch(record_type, typecodes=None):
+    """为一个namedtuple类型生成RecordBatch子类"""
+    if typecodes is None:
+        annotations = getattr(record_type, '__annotations__', {})
+        typecodes = {name: TYPECODES[t] for name, t in annotations.items()
+                     if t in TYPECODES}
+
+    def getter(name):
+        def get(self):
+            return self._batch._columns[name][self._index]
+        return property(get)
+
+    row_class = type(
+        record_type.__name__ + 'Row', (RowView,),
+        dict({name: getter(name) for name in record_type._fields},
+             __slots__=()),
+    )
+    return type(record_type.__name__ + 'Batch', (RecordBatch,), {
+        'record_type': record_type,
+        'typecodes': dict(typecodes),
+        'Row': row_class,
+    })
+
+
+if __name__ == '__main__':
+    Person = collections.namedtuple('Person', 'name age')
+    PersonBatch = record_batch(Person, {'age': 'q'})
+
+    people = PersonBatch([Person('Bob', 30), Person('Jane', 29)])
+    people.append(Person(name='Ann', age=41))
+    people.extend([('Joe', 17), ('Sue', 35)])
+
+    print('Columns:', people._columns)
+    print('Row view:', people[1], people[1].name, people[1].age)
+    print('As Dictionary:', people[2]._asdict())
+
+    adults = people.where('age', lambda age: age >= 30)
+    print('\nage >= 30:', list(adults.iter_tuples()))
+
+    middle = people[1:4]
+    print('\nSlice:', list(middle.iter_tuples()))
+    print('Shares columns?:', middle._columns is people._columns)
+    with middle.column('age') as ages:
+        print('Ages:', ages.tolist())
+
+    try:
+        people.append(Person('Max', 2.5))
+    except TypeError as err:
+        print('\nERROR:', err)
+    print('Lengths:', [len(c) for c in people._columns.values()])
@@ -0,0 +1,55 @@
+# collections_namedtuple_batch_benchmark.py
+
+import collections
+import sys
+import time
+import tracemalloc
+
+from collections_namedtuple_batch import record_batch
+
+Trade = collections.namedtuple('Trade', 'symbol price volume')
+TradeBatch = record_batch(Trade, {'price': 'd', 'volume': 'q'})
+SYMBOLS = ['AAPL', 'GOOG', 'MSFT', 'AMZN']
+
+
+def rows(count):
+    return (Trade(SYMBOLS[i % 4], 100.0 + i % 50, i % 1000)
+            for i in range(count))
+
+
+def build(factory, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = factory(rows(count))
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, elapsed, memory
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+print('{:<12} {:>10} {:>10} {:>12} {:>12} {:>12}'.format(
+    'storage', 'build(s)', 'memory', 'sum col(s)', 'iter rows(s)',
+    'filter(s)'))
+trades, elapsed, memory = build(list, count)
+col, total = timed(lambda: sum(t.volume for t in trades))
+it, _ = timed(lambda: sum(1 for t in trades if t.price > 120))
+flt, big = timed(lambda: [t for t in trades if t.volume >= 900])
+print('{:<12} {:>10.2f} {:>8.1f}MB {:>12.3f} {:>12.3f} {:>12.3f}'.format(
+    'namedtuple', elapsed, memory / 2 ** 20, col, it, flt))
+del trades
+
+batch, elapsed, memory = build(TradeBatch, count)
+col, total2 = timed(lambda: sum(batch.column('volume')))
+it, _ = timed(lambda: sum(1 for t in batch if t.price > 120))
+flt, big2 = timed(lambda: batch.where('volume', lambda v: v >= 900))
+print('{:<12} {:>10.2f} {:>8.1f}MB {:>12.3f} {:>12.3f} {:>12.3f}'.format(
+    'RecordBatch', elapsed, memory / 2 ** 20, col, it, flt))
+print('same results:', total == total2 and len(big) == len(big2))
@@ -0,0 +1,201 @@
+# collections_namedtuple_struct.py
+
+import collections
+import itertools
+import json
+import struct
+
+# 根据typing.NamedTuple的类型注解选择struct的格式
+FORMATS = {int: 'q', float: 'd', bool: '?'}
+
+MAGIC = b'NTREC\x01'
+HEADER = struct.Struct('<6sI')   # 魔数, schema的长度
+BLOCK_RECORDS = 4096
+
+
+class StructCodec:
+    """为一个namedtuple类型预编译的struct.Struct编解码器
+
+    格式中的's'字段在打包时按encoding编码str，编码后超过字段宽度时引发ValueError，
+    解包时去掉末尾的空字节再解码。
+    有's'字段时，打包和解码函数像namedtuple一样用exec()生成，
+    iter_unpack()把Struct.iter_unpack()的结果直接交给解码函数。
+    """
+
+    def __init__(self, record_type, formats=None, byteorder='<',
+                 encoding='utf-8'):
+        fields = record_type._fields
+        if formats is None:
+            annotations = getattr(record_type, '__annotations__', {})
+            formats = {name: FORMATS[annotations[name]] for name in fields
+                       if annotations.get(name) in FORMATS}
+        missing = [name for name in fields if name not in formats]
+        if missing:
+            raise ValueError('no format for fields: {}'.format(missing))
+        self.record_type = record_type
+        self.formats = {name: formats[name] for name in fields}
+        self.encoding = encoding
+        self.struct = struct.Struct(
+            byteorder + ''.join(self.formats.values()))
+        self.size = self.struct.size
+        self._text = [name for name, fmt in self.formats.items()
+                      if fmt.endswith('s')]
+        self._compile()
+
+    def _compile(self):
+        make = self.record_type._make
+        s_pack, s_unpack = self.struct.pack, self.struct.unpack
+        s_pack_into = self.struct.pack_into
+        if not self._text:
+            self.pack = lambda record: s_pack(*record)
+            self.pack_into = lambda buffer, offset, record: s_pack_into(
+                buffer, offset, *record)
+            self.unpack = lambda buffer: make(s_unpack(buffer))
+            self._decode = None
+            return
+
+        # 生成的函数中字段用_f0、_f1……表示：namedtuple的字段名不能以下划线
+        # 开头，所以不会和参数(比如字段名为offset或buffer)冲突
+        fields = self.record_type._fields
+        names = ['_f{}'.format(i) for i in range(len(fields))]
+        widths = {name: struct.calcsize(fmt)
+                  for name, fmt in self.formats.items() if name in self._text}
+        # struct会静默截断过长的字节串，多字节字符也可能被截断一半
+        encode = ''.join(
+            '    {0} = {0}.encode(_encoding)\n'
+            '    if len({0}) > {1}:\n'
+            '        raise ValueError({2!r})\n'.format(
+                var, widths[name],
+                '{} does not fit in {} bytes'.format(name, widths[name]))
+            for var, name in zip(names, fields) if name in widths)
+        decoded = ', '.join(
+            "{}.rstrip(b'\\0').decode(_encoding)".format(var)
+            if name in widths else var
+            for var, name in zip(names, fields))
+        source = (
+            'def pack(record):\n'
+            '    {fields}, = record\n'
+            '{encode}'
+            '    return _pack({fields})\n'
+            'def pack_into(buffer, offset, record):\n'
+            '    {fields}, = record\n'
+            '{encode}'
+            '    _pack_into(buffer, offset, {fields})\n'
+            'def decode({fields}):\n'
+            '    return _new(_cls, ({decoded},))\n'
+        ).format(fields=', '.join(names), encode=encode,
+                 decoded=decoded)
+        namespace = {
+            '_pack': s_pack,
+            '_pack_into': s_pack_into,
+            '_encoding': self.encoding,
+            '_new': tuple.__new__,
+            '_cls': self.record_type,
+        }
+        exec(source, namespace)
+        self.pack = namespace['pack']
+        self.pack_into = namespace['pack_into']
+        decode = self._decode = namespace['decode']
+        self.unpack = lambda buffer: decode(*s_unpack(buffer))
+
+    def unpack_from(self, buffer, offset=0):
+        return self.unpack(
+            memoryview(buffer)[offset:offset + self.size])
+
+    def iter_unpack(self, buffer):
+        """按顺序解包buffer中的所有记录，buffer的长度必须是size的整数倍"""
+        if self._decode is None:
+            return map(self.record_type._make,
+                       self.struct.iter_unpack(buffer))
+        return itertools.starmap(self._decode,
+                                 self.struct.iter_unpack(buffer))
+
+    def schema(self):
+        return {
+            'name': self.record_type.__name__,
+            'fields': list(self.formats),
+            'formats': list(self.formats.values()),
+            'byteorder': self.struct.format[0],
+            'encoding': self.encoding,
+        }
+
+    @classmethod
+    def from_schema(cls, schema, record_type=None):
+        if record_type is None:
+            record_type = collections.namedtuple(
+                schema['name'], schema['fields'])
+        elif list(record_type._fields) != schema['fields']:
+            raise ValueError('fields do not match: {} != {}'.format(
+                list(record_type._fields), schema['fields']))
+        return cls(record_type, dict(zip(schema['fields'],
+                                          schema['formats'])),
+                   schema['byteorder'], schema['encoding'])
+
+
+def write_records(f, codec, records):
+    """写入schema头和所有记录，返回记录的个数"""
+    schema = json.dumps(codec.schema()).encode('utf-8')
+    f.write(HEADER.pack(MAGIC, len(schema)))
+    f.write(schema)
+    records = iter(records)
+    count = 0
+    while True:
+        block = b''.join(map(codec.pack,
+                             itertools.islice(records, BLOCK_RECORDS)))
+        if not block:
+            return count
+        f.write(block)
+        count += len(block) // codec.size
+
+
+def read_records(f, record_type=None):
+    """读取schema头，然后逐块解包记录
+
+    没有提供record_type时，根据schema创建一个新的namedtuple类型。
+    """
+    magic, length = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError('not a record file: {!r}'.format(magic))
+    codec = StructCodec.from_schema(
+        json.loads(f.read(length).decode('utf-8')), record_type)
+    block_size = BLOCK_RECORDS * codec.size
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        if len(block) % codec.size:
+            raise ValueError('truncated record at end of file')
+        yield from codec.iter_unpack(block)
+
+
+if __name__ == '__main__':
+    import binascii
+    import io
+
+    Person = collections.namedtuple('Person', 'name age')
+    codec = StructCodec(Person, {'name': '10s', 'age': 'i'})
+
+    bob = Person(name='Bob', age=30)
+    data = codec.pack(bob)
+    print('Format  :', codec.struct.format, codec.size, 'bytes')
+    print('Packed  :', binascii.hexlify(data))
+    print('Unpacked:', codec.unpack(data))
+
+    buffer = bytearray(codec.size * 2)
+    codec.pack_into(buffer, codec.size, bob._replace(name='Robert'))
+    print('From buffer:', codec.unpack_from(buffer, codec.size))
+
+    for call in (lambda: codec.pack_into(buffer, codec.size + 1, bob),
+                 lambda: codec.pack(Person('Bartholomew', 30)),
+                 lambda: StructCodec(Person)):
+        try:
+            call()
+        except (struct.error, ValueError) as err:
+            print('ERROR:', err)
+
+    f = io.BytesIO()
+    write_records(f, codec, [bob, Person('Jane', 29), Person('Ann', 41)])
+    f.seek(0)
+    print('\nRecords:', list(read_records(f, Person)))
+    f.seek(0)
+    print('Without type:', list(read_records(f))[-1])
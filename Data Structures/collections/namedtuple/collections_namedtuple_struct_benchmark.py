@@ -0,0 +1,67 @@
+# collections_namedtuple_struct_benchmark.py
+
+import collections
+import csv
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from collections_namedtuple_struct import (StructCodec, read_records,
+                                           write_records)
+
+Trade = collections.namedtuple('Trade', 'symbol price volume')
+SYMBOLS = ['AAPL', 'GOOG', 'MSFT', 'AMZN']
+
+
+def write_struct(f, trades):
+    write_records(f, StructCodec(Trade, {'symbol': '4s', 'price': 'd',
+                                         'volume': 'q'}), trades)
+
+
+def read_struct(f):
+    return list(read_records(f, Trade))
+
+
+def write_pickle(f, trades):
+    pickle.dump(trades, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_pickle(f):
+    return pickle.load(f)
+
+
+def write_csv(f, trades):
+    with open(f.fileno(), 'w', newline='', closefd=False) as text:
+        csv.writer(text).writerows(trades)
+
+
+def read_csv(f):
+    with open(f.fileno(), newline='', closefd=False) as text:
+        return [Trade(symbol, float(price), int(volume))
+                for symbol, price, volume in csv.reader(text)]
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+trades = [Trade(SYMBOLS[i % 4], 100.0 + i % 50 / 4, i % 1000)
+          for i in range(count)]
+
+print('{:<8} {:>10} {:>16} {:>16}'.format(
+    'format', 'size(MB)', 'write(krec/s)', 'read(krec/s)'))
+for name, write, read in [('struct', write_struct, read_struct),
+                          ('pickle', write_pickle, read_pickle),
+                          ('csv', write_csv, read_csv)]:
+    with tempfile.TemporaryFile() as f:
+        start = time.perf_counter()
+        write(f, trades)
+        f.flush()
+        write_time = time.perf_counter() - start
+        size = os.fstat(f.fileno()).st_size / 2 ** 20
+        f.seek(0)
+        start = time.perf_counter()
+        result = read(f)
+        read_time = time.perf_counter() - start
+    assert result == trades, name
+    print('{:<8} {:>10.1f} {:>16,.0f} {:>16,.0f}'.format(
+        name, size, count / write_time / 1000, count / read_time / 1000))
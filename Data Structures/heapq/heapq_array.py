@@ -0,0 +1,134 @@
+# heapq_array.py
+
+import array
+import heapq
+
+
+class ArrayHeap:
+    """用array.array存储的数值最小堆，每个元素只占一个机器数值的空间"""
+
+    def __init__(self, typecode='d', payload=False):
+        self.values = array.array(typecode)
+        # 可选的并行数组，保存每个值对应的载荷下标(例如事件在另一个表中的位置)
+        self.payloads = array.array('q') if payload else None
+
+    def __len__(self):
+        return len(self.values)
+
+    def __bool__(self):
+        return len(self.values) > 0
+
+    def _result(self, i):
+        if self.payloads is None:
+            return self.values[i]
+        return self.values[i], self.payloads[i]
+
+    def push(self, value, payload=0):
+        self.values.append(value)
+        if self.payloads is not None:
+            self.payloads.append(payload)
+        self._siftdown(len(self.values) - 1)
+
+    def pop(self):
+        values, payloads = self.values, self.payloads
+        last = values.pop()
+        last_payload = payloads.pop() if payloads is not None else 0
+        if not values:
+            return last if payloads is None else (last, last_payload)
+        result = self._result(0)
+        values[0] = last
+        if payloads is not None:
+            payloads[0] = last_payload
+        self._siftup(0)
+        return result
+
+    def pushpop(self, value, payload=0):
+        """先push再pop，但比分开调用更快"""
+        values = self.values
+        if values and values[0] < value:
+            result = self._result(0)
+            values[0] = value
+            if self.payloads is not None:
+                self.payloads[0] = payload
+            self._siftup(0)
+            return result
+        return value if self.payloads is None else (value, payload)
+
+    def heapify(self, values, payloads=None):
+        """用给定的值替换堆的内容，O(n)"""
+        self.values = array.array(self.values.typecode, values)
+        if self.payloads is not None:
+            if payloads is None:
+                payloads = range(len(self.values))
+            self.payloads = array.array('q', payloads)
+        for i in reversed(range(len(self.values) // 2)):
+            self._siftup(i)
+
+    def nsmallest(self, n):
+        """不修改堆，只访问O(n)个节点就找出最小的n个元素"""
+        values = self.values
+        size = len(values)
+        result = []
+        candidates = [(values[0], 0)] if size else []
+        while candidates and len(result) < n:
+            value, i = heapq.heappop(candidates)
+            result.append(self._result(i))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size:
+                    heapq.heappush(candidates, (values[child], child))
+        return result
+
+    # 与heapq的命名相同：_siftdown向根的方向移动，_siftup向叶子方向移动
+    def _siftdown(self, i):
+        values, payloads = self.values, self.payloads
+        value = values[i]
+        payload = payloads[i] if payloads is not None else 0
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not value < values[parent]:
+                break
+            values[i] = values[parent]
+            if payloads is not None:
+                payloads[i] = payloads[parent]
+            i = parent
+        values[i] = value
+        if payloads is not None:
+            payloads[i] = payload
+
+    def _siftup(self, i):
+        values, payloads = self.values, self.payloads
+        n = len(values)
+        value = values[i]
+        payload = payloads[i] if payloads is not None else 0
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and values[right] < values[child]:
+                child = right
+            if not values[child] < value:
+                break
+            values[i] = values[child]
+            if payloads is not None:
+                payloads[i] = payloads[child]
+            i = child
+        values[i] = value
+        if payloads is not None:
+            payloads[i] = payload
+
+
+if __name__ == '__main__':
+    from heapq_showtree import show_tree
+    from heapq_heapdata import data
+
+    heap = ArrayHeap('q', payload=True)
+    heap.heapify(data)
+    print('values  :', heap.values)
+    print('payloads:', heap.payloads)
+    show_tree(heap.values)
+
+    print('3 smallest:', heap.nsmallest(3))
+    print('pushpop 5 :', heap.pushpop(5, 99))
+    while heap:
+        print('pop       :', heap.pop())
@@ -0,0 +1,67 @@
+# heapq_array_benchmark.py
+
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+
+from heapq_array import ArrayHeap
+
+
+def build_list(values):
+    heap = []
+    for v in values:
+        heapq.heappush(heap, v)
+    return heap
+
+
+def build_array(values, payload):
+    heap = ArrayHeap('d', payload=payload)
+    for i, v in enumerate(values):
+        heap.push(v, i)
+    return heap
+
+
+def bytes_per_element(build, n):
+    # 每次都生成新的浮点数对象，这样列表的开销里包括了它们
+    tracemalloc.start()
+    heap = build(random.random() for _ in range(n))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return heap, size / n
+
+
+def rate(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return n / (time.perf_counter() - start)
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+ops = n // 10
+random.seed(2016)
+print('{:,} elements'.format(n))
+print('{:<20} {:>10} {:>12} {:>12} {:>12}'.format(
+    'heap', 'bytes/elem', 'push/s', 'pop/s', 'pushpop/s'))
+
+cases = [
+    ('list + heapq', lambda values: build_list(values),
+     lambda h: lambda: heapq.heappush(h, random.random()),
+     lambda h: lambda: heapq.heappop(h),
+     lambda h: lambda: heapq.heappushpop(h, random.random())),
+    ('ArrayHeap(d)', lambda values: build_array(values, False),
+     lambda h: lambda: h.push(random.random()),
+     lambda h: h.pop,
+     lambda h: lambda: h.pushpop(random.random())),
+    ('ArrayHeap(d)+payload', lambda values: build_array(values, True),
+     lambda h: lambda: h.push(random.random(), 1),
+     lambda h: h.pop,
+     lambda h: lambda: h.pushpop(random.random(), 1)),
+]
+for name, build, push, pop, pushpop in cases:
+    heap, size = bytes_per_element(build, n)
+    print('{:<20} {:>10.1f} {:>12,.0f} {:>12,.0f} {:>12,.0f}'.format(
+        name, size, rate(push(heap), ops), rate(pop(heap), ops),
+        rate(pushpop(heap), ops)))
@@ -0,0 +1,125 @@
+# heapq_external_sort.py
+
+import heapq
+import os
+import struct
+import sys
+import tempfile
+
+BUFFER_SIZE = 1024 * 1024
+# 内存中每一行除了数据本身的额外开销：bytes对象的头部和列表中的指针
+LINE_OVERHEAD = sys.getsizeof(b'') + struct.calcsize('P')
+
+
+class SortStats:
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.runs = 0
+        self.passes = 0
+
+
+def _write_run(lines, tmpdir, stats):
+    fd, name = tempfile.mkstemp(suffix='.run', dir=tmpdir)
+    with open(fd, 'wb', buffering=BUFFER_SIZE) as f:
+        f.writelines(lines)
+    stats.bytes_written += os.path.getsize(name)
+    return name
+
+
+def _read_run(f, max_memory, stats):
+    """读取行，直到它们在内存中大约占用max_memory字节"""
+    lines = []
+    used = 0
+    for line in f:
+        lines.append(line)
+        stats.bytes_read += len(line)
+        used += len(line) + LINE_OVERHEAD
+        if used >= max_memory:
+            break
+    return lines
+
+
+def make_runs(infile, max_memory, tmpdir, stats, key=None):
+    """把输入切成在内存中不超过max_memory字节的块，各自排序后写入临时文件
+
+    限制是近似的：每行按数据长度加上LINE_OVERHEAD计算，
+    不包括列表预留的空间和key函数产生的对象。
+    """
+    runs = []
+    with open(infile, 'rb', buffering=BUFFER_SIZE) as f:
+        while True:
+            lines = _read_run(f, max_memory, stats)
+            if not lines:
+                break
+            if not lines[-1].endswith(b'\n'):
+                lines[-1] += b'\n'
+            lines.sort(key=key)
+            runs.append(_write_run(lines, tmpdir, stats))
+    stats.runs = len(runs)
+    return runs
+
+
+def merge_runs(runs, outfile, stats, key=None):
+    files = [open(name, 'rb', buffering=BUFFER_SIZE) for name in runs]
+    try:
+        with open(outfile, 'wb', buffering=BUFFER_SIZE) as out:
+            out.writelines(heapq.merge(*files, key=key))
+    finally:
+        for f in files:
+            f.close()
+    for name in runs:
+        stats.bytes_read += os.path.getsize(name)
+        os.remove(name)
+    stats.bytes_written += os.path.getsize(outfile)
+
+
+def external_sort(infile, outfile, max_memory=64 * 1024 * 1024, fan_in=16,
+                  key=None, tmpdir=None):
+    """对大于内存的文本文件按行排序
+
+    一次最多合并fan_in个临时文件；临时文件更多时先分组合并，
+    直到剩下的文件不超过fan_in个(多趟合并)。
+    """
+    if fan_in < 2:
+        # 每组只有一个文件时分组合并不会减少文件数
+        raise ValueError('fan_in must be at least 2')
+    stats = SortStats()
+    runs = make_runs(infile, max_memory, tmpdir, stats, key)
+    while len(runs) > fan_in:
+        stats.passes += 1
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            if len(group) == 1:
+                merged.extend(group)
+                continue
+            fd, name = tempfile.mkstemp(suffix='.run', dir=tmpdir)
+            os.close(fd)
+            merge_runs(group, name, stats, key)
+            merged.append(name)
+        runs = merged
+    stats.passes += 1
+    merge_runs(runs, outfile, stats, key)
+    return stats
+
+
+if __name__ == '__main__':
+    import random
+
+    random.seed(2016)
+    with tempfile.TemporaryDirectory() as dirname:
+        infile = os.path.join(dirname, 'input.txt')
+        outfile = os.path.join(dirname, 'output.txt')
+        with open(infile, 'w') as f:
+            for i in range(20):
+                f.write('{:02d}\n'.format(random.randint(1, 99)))
+
+        # 很小的内存限制，强制生成多个临时文件并进行多趟合并
+        stats = external_sort(infile, outfile, max_memory=200, fan_in=3,
+                              tmpdir=dirname)
+        print('runs  :', stats.runs)
+        print('passes:', stats.passes)
+        with open(outfile) as f:
+            print('sorted:', ' '.join(line.strip() for line in f))
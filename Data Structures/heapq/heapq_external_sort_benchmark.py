@@ -0,0 +1,55 @@
+# heapq_external_sort_benchmark.py
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from heapq_external_sort import external_sort
+
+MB = 1024 * 1024
+
+
+def generate(filename, size):
+    random.seed(2016)
+    written = 0
+    with open(filename, 'wb', buffering=MB) as f:
+        while written < size:
+            block = b''.join(
+                b'%020d %s\n' % (random.getrandbits(64), b'x' * 40)
+                for _ in range(10000)
+            )
+            f.write(block)
+            written += len(block)
+
+
+def is_sorted(filename):
+    with open(filename, 'rb', buffering=MB) as f:
+        previous = b''
+        for line in f:
+            if line < previous:
+                return False
+            previous = line
+    return True
+
+
+size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+memory_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+
+with tempfile.TemporaryDirectory() as dirname:
+    infile = os.path.join(dirname, 'input.txt')
+    outfile = os.path.join(dirname, 'output.txt')
+    generate(infile, size_mb * MB)
+    print('input {} MB, memory limit {} MB'.format(size_mb, memory_mb))
+    print('{:>6} {:>5} {:>7} {:>10} {:>13} {:>8}'.format(
+        'fan-in', 'runs', 'passes', 'read(MB)', 'written(MB)', 'time(s)'))
+    for fan_in in (64, 4):
+        start = time.perf_counter()
+        stats = external_sort(infile, outfile, memory_mb * MB, fan_in,
+                              tmpdir=dirname)
+        elapsed = time.perf_counter() - start
+        assert is_sorted(outfile)
+        print('{:>6} {:>5} {:>7} {:>10.0f} {:>13.0f} {:>8.1f}'.format(
+            fan_in, stats.runs, stats.passes, stats.bytes_read / MB,
+            stats.bytes_written / MB, elapsed))
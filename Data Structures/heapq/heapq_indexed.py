@@ -0,0 +1,127 @@
+# heapq_indexed.py
+
+
+class IndexedHeap:
+    """带位置索引的二叉最小堆，支持decrease_key()和remove()"""
+
+    def __init__(self):
+        self._keys = []     # 与heapq相同的数组布局
+        self._items = []
+        self._pos = {}      # item -> 在数组中的下标
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, item):
+        return item in self._pos
+
+    def __iter__(self):
+        return iter(zip(self._keys, self._items))
+
+    def priority(self, item):
+        return self._keys[self._pos[item]]
+
+    def peek(self):
+        return self._keys[0], self._items[0]
+
+    def push(self, item, priority):
+        if item in self._pos:
+            raise KeyError('{!r} is already in the heap'.format(item))
+        self._keys.append(priority)
+        self._items.append(item)
+        self._pos[item] = len(self._keys) - 1
+        self._siftdown(len(self._keys) - 1)
+
+    def pop(self):
+        priority, item = self._keys[0], self._items[0]
+        self._delete(0)
+        return priority, item
+
+    def remove(self, item):
+        self._delete(self._pos[item])
+
+    def decrease_key(self, item, priority):
+        i = self._pos[item]
+        if priority > self._keys[i]:
+            raise ValueError('new priority is larger than the current one')
+        self._keys[i] = priority
+        self._siftdown(i)
+
+    def update(self, item, priority):
+        """改变优先级，可以变大也可以变小"""
+        i = self._pos[item]
+        old = self._keys[i]
+        self._keys[i] = priority
+        if priority < old:
+            self._siftdown(i)
+        else:
+            self._siftup(i)
+
+    def _delete(self, i):
+        keys, items, pos = self._keys, self._items, self._pos
+        del pos[items[i]]
+        last_key, last_item = keys.pop(), items.pop()
+        if i == len(keys):
+            return
+        old = keys[i]
+        keys[i], items[i] = last_key, last_item
+        pos[last_item] = i
+        if last_key < old:
+            self._siftdown(i)
+        else:
+            self._siftup(i)
+
+    # 与heapq的命名相同：_siftdown向根的方向移动，_siftup向叶子方向移动
+    def _siftdown(self, i):
+        keys, items, pos = self._keys, self._items, self._pos
+        key, item = keys[i], items[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not key < keys[parent]:
+                break
+            keys[i], items[i] = keys[parent], items[parent]
+            pos[items[i]] = i
+            i = parent
+        keys[i], items[i] = key, item
+        pos[item] = i
+
+    def _siftup(self, i):
+        keys, items, pos = self._keys, self._items, self._pos
+        n = len(keys)
+        key, item = keys[i], items[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and keys[right] < keys[child]:
+                child = right
+            if not keys[child] < key:
+                break
+            keys[i], items[i] = keys[child], items[child]
+            pos[items[i]] = i
+            i = child
+        keys[i], items[i] = key, item
+        pos[item] = i
+
+
+if __name__ == '__main__':
+    from heapq_showtree import show_tree
+    from heapq_heapdata import data
+
+    heap = IndexedHeap()
+    for n in data:
+        heap.push('item{}'.format(n), n)
+    show_tree(heap._keys)
+
+    print('contains item10:', 'item10' in heap)
+    print('decrease item19 to 1')
+    heap.decrease_key('item19', 1)
+    show_tree(heap._keys)
+
+    print('remove item9')
+    heap.remove('item9')
+    show_tree(heap._keys)
+
+    while heap:
+        print('pop:', heap.pop())
@@ -0,0 +1,73 @@
+# heapq_indexed_benchmark.py
+
+import heapq
+import random
+import sys
+import time
+
+from heapq_indexed import IndexedHeap
+
+
+def make_graph(num_nodes, num_edges):
+    random.seed(2016)
+    graph = [[] for _ in range(num_nodes)]
+    for _ in range(num_edges):
+        u = random.randrange(num_nodes)
+        v = random.randrange(num_nodes)
+        graph[u].append((v, random.randint(1, 100)))
+    return graph
+
+
+def dijkstra_lazy(graph, source):
+    # heapq文档中的做法：重复放入新的距离，弹出时跳过过期的条目
+    dist = {source: 0}
+    heap = [(0, source)]
+    pushes = 1
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v, w in graph[u]:
+            nd = d + w
+            if nd < dist.get(v, nd + 1):
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+                pushes += 1
+    return dist, pushes
+
+
+def dijkstra_indexed(graph, source):
+    dist = {source: 0}
+    heap = IndexedHeap()
+    heap.push(source, 0)
+    pushes = 1
+    while heap:
+        d, u = heap.pop()
+        for v, w in graph[u]:
+            nd = d + w
+            old = dist.get(v)
+            if old is None:
+                dist[v] = nd
+                heap.push(v, nd)
+                pushes += 1
+            elif nd < old and v in heap:
+                dist[v] = nd
+                heap.decrease_key(v, nd)
+    return dist, pushes
+
+
+num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+graph = make_graph(num_edges // 10, num_edges)
+print('{:,} nodes, {:,} edges'.format(len(graph), num_edges))
+
+results = []
+for name, func in [('lazy deletion', dijkstra_lazy),
+                   ('indexed heap', dijkstra_indexed)]:
+    start = time.perf_counter()
+    dist, pushes = func(graph, 0)
+    elapsed = time.perf_counter() - start
+    results.append(dist)
+    print('{:<14} {:>6.2f}s  {:>9,} heap entries'.format(
+        name, elapsed, pushes))
+
+print('same distances:', results[0] == results[1])
@@ -0,0 +1,145 @@
+# heapq_streaming.py
+
+import collections
+import heapq
+import itertools
+import math
+
+
+class TopK:
+    """在无界的数据流中保留最大的k个元素，内存为O(k)"""
+
+    def __init__(self, k, key=None):
+        self.k = k
+        self.key = key
+        self.heap = []      # 最小堆，堆顶是当前第k大的元素
+        self._counter = itertools.count()
+
+    def add(self, item):
+        key = item if self.key is None else self.key(item)
+        entry = (key, next(self._counter), item)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif key > self.heap[0][0]:
+            heapq.heappushpop(self.heap, entry)
+
+    def update(self, iterable):
+        for item in iterable:
+            self.add(item)
+
+    def merge(self, other):
+        """合并另一个TopK(例如在另一个进程中得到的结果)"""
+        for key, _, item in other.heap:
+            self.add(item)
+        return self
+
+    def result(self):
+        return [item for key, _, item in sorted(self.heap, reverse=True)]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_counter']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._counter = itertools.count(len(self.heap))
+
+
+class QuantileSketch:
+    """可合并的分位数草图，相对误差不超过relative_accuracy
+
+    把正数按对数分桶(DDSketch的做法)：第i个桶覆盖(gamma**(i-1), gamma**i]，
+    桶中的值都用同一个代表值估计，所以误差与值的大小成比例。
+    负数使用单独的一组桶，零单独计数。
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = collections.Counter()
+        self.negative = collections.Counter()
+        self.zero = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def add(self, value):
+        if value > 0:
+            self.positive[self._bucket(value)] += 1
+        elif value < 0:
+            self.negative[self._bucket(-value)] += 1
+        else:
+            self.zero += 1
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def update(self, iterable):
+        for value in iterable:
+            self.add(value)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError('sketches have different accuracy')
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero += other.zero
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            raise ValueError('empty sketch')
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                return max(-self._value(bucket), self.min)
+        seen += self.zero
+        if seen > rank:
+            return 0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if seen > rank:
+                return min(self._value(bucket), self.max)
+        return self.max
+
+    def __len__(self):
+        return self.count
+
+
+if __name__ == '__main__':
+    from heapq_heapdata import data
+
+    top = TopK(3)
+    sketch = QuantileSketch(0.01)
+    for n in data:
+        top.add(n)
+        sketch.add(n)
+    print('all       :', data)
+    print('3 largest :', top.result())
+    print('median    : {:.2f}'.format(sketch.quantile(0.5)))
+
+    # 在两个“工作进程”中分别处理一部分数据，然后合并
+    more = [3, 25, 8, 14]
+    top2, sketch2 = TopK(3), QuantileSketch(0.01)
+    top2.update(more)
+    sketch2.update(more)
+    top.merge(top2)
+    sketch.merge(sketch2)
+    print('merged    :', sorted(data + more))
+    print('3 largest :', top.result())
+    print('median    : {:.2f}'.format(sketch.quantile(0.5)))
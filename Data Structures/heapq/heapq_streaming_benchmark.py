@@ -0,0 +1,63 @@
+# heapq_streaming_benchmark.py
+
+import heapq
+import multiprocessing
+import random
+import sys
+import time
+
+from heapq_streaming import QuantileSketch, TopK
+
+K = 100
+QUANTILES = [0.5, 0.9, 0.99, 0.999]
+
+
+def stream(seed, n):
+    # 类似请求延迟的长尾分布
+    rng = random.Random(seed)
+    return (rng.lognormvariate(3, 1) for _ in range(n))
+
+
+def summarize(args):
+    seed, n = args
+    top, sketch = TopK(K), QuantileSketch(0.01)
+    for value in stream(seed, n):
+        top.add(value)
+        sketch.add(value)
+    return top, sketch
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workers = 4
+
+    start = time.perf_counter()
+    top, sketch = summarize((0, n))
+    elapsed = time.perf_counter() - start
+    print('single process: {:,.0f} values/s'.format(n / elapsed))
+
+    chunks = [(seed, n // workers) for seed in range(1, workers + 1)]
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        parts = pool.map(summarize, chunks)
+    merged_top, merged_sketch = parts[0]
+    for part_top, part_sketch in parts[1:]:
+        merged_top.merge(part_top)
+        merged_sketch.merge(part_sketch)
+    elapsed = time.perf_counter() - start
+    print('{} processes + merge: {:,.0f} values/s'.format(
+        workers, n / elapsed))
+
+    # 与把全部数据放在内存中的精确结果比较
+    values = sorted(v for seed, size in chunks for v in stream(seed, size))
+    exact_top = heapq.nlargest(K, values)
+    print('top-{} exact: {}'.format(K, merged_top.result() == exact_top))
+    print('{:>7} {:>10} {:>10} {:>8}'.format(
+        'q', 'exact', 'sketch', 'error'))
+    for q in QUANTILES:
+        exact = values[int(q * (len(values) - 1))]
+        estimate = merged_sketch.quantile(q)
+        print('{:>7} {:>10.3f} {:>10.3f} {:>7.2%}'.format(
+            q, exact, estimate, abs(estimate - exact) / exact))
+    print('sketch buckets: {} for {:,} values'.format(
+        len(merged_sketch.positive), len(merged_sketch)))
@@ -0,0 +1,284 @@
+# fetch_podcasts_asyncio.py
+
+import asyncio
+import collections
+import os
+import sys
+from urllib.parse import urljoin, urlsplit
+
+from fetch_podcasts_manifest import Manifest, RestartDownload
+
+CHUNK_SIZE = 64 * 1024
+MAX_REDIRECTS = 5
+USER_AGENT = 'fetch_podcasts_asyncio.py'
+
+
+def message(s):
+    try:
+        name = asyncio.current_task().get_name()
+    except RuntimeError:
+        name = 'main'
+    print('{}: {}'.format(name, s))
+
+
+class ConnectionPool:
+    """按(scheme, host, port)缓存空闲的keep-alive连接"""
+
+    def __init__(self):
+        self._idle = collections.defaultdict(list)
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self, key):
+        idle = self._idle[key]
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer, True
+            writer.close()
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=True if scheme == 'https' else None,
+            limit=CHUNK_SIZE * 2,
+        )
+        self.opened += 1
+        return reader, writer, False
+
+    def release(self, key, reader, writer):
+        self._idle[key].append((reader, writer))
+
+    def close(self):
+        for idle in self._idle.values():
+            for reader, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+class Response:
+
+    def __init__(self, pool, key, reader, writer, method, status, headers):
+        self.pool = pool
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.method = method
+        self.status = status
+        self.headers = headers
+
+    def _reusable(self):
+        if self.headers.get('connection', '').lower() == 'close':
+            return False
+        return ('content-length' in self.headers or
+                'chunked' in self.headers.get('transfer-encoding', '') or
+                not self._has_body())
+
+    def _has_body(self):
+        return not (self.method == 'HEAD' or
+                    self.status in (204, 304) or
+                    100 <= self.status < 200)
+
+    async def iter_chunks(self):
+        reader = self.reader
+        if not self._has_body():
+            pass
+        elif 'chunked' in self.headers.get('transfer-encoding', ''):
+            while True:
+                line = await reader.readline()
+                size = int(line.split(b';')[0].strip(), 16)
+                if size == 0:
+                    # 跳过trailer
+                    while (await reader.readline()) not in (b'\r\n', b''):
+                        pass
+                    break
+                while size:
+                    data = await reader.readexactly(min(size, CHUNK_SIZE))
+                    size -= len(data)
+                    yield data
+                await reader.readexactly(2)
+        elif 'content-length' in self.headers:
+            remaining = int(self.headers['content-length'])
+            while remaining:
+                data = await reader.read(min(remaining, CHUNK_SIZE))
+                if not data:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await reader.read(CHUNK_SIZE)
+                if not data:
+                    break
+                yield data
+        self.release()
+
+    async def drain(self):
+        async for _ in self.iter_chunks():
+            pass
+
+    def release(self):
+        if self.writer is None:
+            return
+        if self._reusable():
+            self.pool.release(self.key, self.reader, self.writer)
+        else:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def _send(pool, url, method, headers):
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    key = (parts.scheme, parts.hostname, port)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    lines = [
+        '{} {} HTTP/1.1'.format(method, path),
+        'Host: {}'.format(parts.netloc),
+        'User-Agent: {}'.format(USER_AGENT),
+        'Connection: keep-alive',
+    ]
+    lines.extend('{}: {}'.format(k, v) for k, v in (headers or {}).items())
+    request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    while True:
+        reader, writer, reused = await pool.acquire(key)
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status_line = b''
+        if status_line:
+            break
+        writer.close()
+        if not reused:
+            raise ConnectionError('no response from {}'.format(key[1]))
+        # 服务器已经关闭了空闲连接，换一个新连接重试
+
+    status = int(status_line.split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    return Response(pool, key, reader, writer, method, status,
+                    response_headers)
+
+
+async def request(pool, url, method='GET', headers=None):
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await _send(pool, url, method, headers)
+        if response.status in (301, 302, 303, 307, 308):
+            await response.drain()
+            url = urljoin(url, response.headers['location'])
+            continue
+        response.url = url
+        return response
+    raise RuntimeError('too many redirects')
+
+
+async def download(pool, url, dest='.', manifest=None):
+    try:
+        return await _download(pool, url, dest, manifest)
+    except RestartDownload:
+        # 不完整的文件已经删除，这一次不会再带Range
+        return await _download(pool, url, dest, manifest)
+
+
+async def _download(pool, url, dest, manifest):
+    filename = os.path.join(dest, url.rpartition('/')[-1])
+    headers, offset = {}, 0
+    if manifest is not None:
+        headers, offset = manifest.prepare(url, filename)
+    response = await request(pool, url, headers=headers)
+    try:
+        if manifest is not None:
+            started = manifest.start(url, filename, response.status,
+                                     response.headers, offset)
+        elif response.status == 200:
+            started = ('wb', None)
+        else:
+            raise RuntimeError('{} -> HTTP {}'.format(url, response.status))
+        if started is None:
+            await response.drain()
+            return filename, None
+        mode, hasher = started
+        with open(filename + '.part', mode) as outfile:
+            async for chunk in response.iter_chunks():
+                if hasher is not None:
+                    hasher.update(chunk)
+                outfile.write(chunk)
+    except BaseException:
+        response.close()
+        raise
+    if manifest is not None:
+        return filename, manifest.finish(url, filename, hasher)
+    os.replace(filename + '.part', filename)
+    return filename, os.path.getsize(filename)
+
+
+async def download_enclosures(q, pool, dest, manifest):
+    while True:
+        url = await q.get()
+        try:
+            message('downloading {}'.format(url.rpartition('/')[-1]))
+            filename, size = await download(pool, url, dest, manifest)
+            if size is None:
+                message('unchanged {}'.format(filename))
+            else:
+                message('wrote {} bytes to {}'.format(size, filename))
+        except Exception as err:
+            message('failed {}: {}'.format(url, err))
+        finally:
+            q.task_done()
+
+
+async def fetch_enclosures(urls, concurrency=4, dest='.', manifest=None):
+    q = asyncio.Queue()
+    pool = ConnectionPool()
+    workers = [
+        asyncio.create_task(download_enclosures(q, pool, dest, manifest),
+                            name='worker-{}'.format(i))
+        for i in range(concurrency)
+    ]
+    for url in urls:
+        q.put_nowait(url)
+    await q.join()
+    for w in workers:
+        w.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    pool.close()
+    return pool
+
+
+if __name__ == '__main__':
+    import feedparser   # 第三方库
+
+    num_fetch_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    feed_urls = [
+        'http://talkpython.fm/episodes/rss'
+    ]
+
+    enclosure_urls = []
+    for url in feed_urls:
+        response = feedparser.parse(url, agent=USER_AGENT)
+        for entry in response['entries'][:5]:
+            for enclosure in entry.get('enclosures', []):
+                message('queuing {}'.format(
+                    urlsplit(enclosure['url']).path.rpartition('/')[-1]))
+                enclosure_urls.append(enclosure['url'])
+
+    manifest = Manifest('enclosures.json')
+    pool = asyncio.run(
+        fetch_enclosures(enclosure_urls, num_fetch_tasks, manifest=manifest))
+    message('*** done: {} connections opened, {} reused'.format(
+        pool.opened, pool.reused))
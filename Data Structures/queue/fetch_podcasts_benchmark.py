@@ -0,0 +1,119 @@
+# fetch_podcasts_benchmark.py
+
+import asyncio
+import http.server
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from fetch_podcasts_asyncio import fetch_enclosures
+
+BLOCK = b'\0' * (64 * 1024)
+
+
+class EnclosureHandler(http.server.BaseHTTPRequestHandler):
+    """本地替身服务器：/<name>-<size>.mp3 返回size字节的数据"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        size = int(self.path.rpartition('-')[-1].partition('.')[0])
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        while size:
+            n = min(size, len(BLOCK))
+            self.wfile.write(BLOCK[:n])
+            size -= n
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                             EnclosureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_threaded(urls, dest, num_fetch_threads=2):
+    # 与fetch_podcasts.py中的下载线程相同
+    enclosure_queue = queue.Queue()
+
+    def download_enclosures(q):
+        while True:
+            url = q.get()
+            filename = os.path.join(dest, url.rpartition('/')[-1])
+            response = urllib.request.urlopen(url)
+            data = response.read()
+            with open(filename, 'wb') as outfile:
+                outfile.write(data)
+            q.task_done()
+
+    for i in range(num_fetch_threads):
+        threading.Thread(target=download_enclosures,
+                         args=(enclosure_queue,), daemon=True).start()
+    for url in urls:
+        enclosure_queue.put(url)
+    enclosure_queue.join()
+
+
+def run_asyncio(urls, dest, concurrency):
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(fetch_enclosures(urls, concurrency, dest))
+
+
+def child(mode, port, count, size, concurrency):
+    urls = ['http://127.0.0.1:{}/episode{}-{}.mp3'.format(port, i, size)
+            for i in range(count)]
+    with tempfile.TemporaryDirectory() as dest:
+        if mode == 'threaded':
+            run_threaded(urls, dest)
+        else:
+            run_asyncio(urls, dest, concurrency)
+
+
+def measure(mode, port, count, size, concurrency):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, __file__, mode, str(port),
+                             str(count), str(size), str(concurrency)])
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise RuntimeError('{} run failed'.format(mode))
+    # Linux上ru_maxrss的单位是KB
+    return elapsed, usage.ru_maxrss / 1024
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 6 and sys.argv[1] in ('threaded', 'asyncio'):
+        child(sys.argv[1], *map(int, sys.argv[2:]))
+        sys.exit(0)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 8 * 1024 * 1024
+    server = start_server()
+    port = server.server_address[1]
+    total_mb = count * size / 1024 / 1024
+
+    print('{} enclosures x {:.1f} MB'.format(count, size / 1024 / 1024))
+    print('{:<14} {:>8} {:>10} {:>13}'.format(
+        'mode', 'time(s)', 'MB/s', 'peak RSS(MB)'))
+    runs = [('threaded', 2)] + [('asyncio', c) for c in (2, 8)]
+    for mode, concurrency in runs:
+        elapsed, rss = measure(mode, port, count, size, concurrency)
+        print('{:<14} {:>8.2f} {:>10.1f} {:>13.1f}'.format(
+            '{}({})'.format(mode, concurrency), elapsed,
+            total_mb / elapsed, rss))
+    server.shutdown()
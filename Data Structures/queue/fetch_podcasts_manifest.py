@@ -0,0 +1,164 @@
+# fetch_podcasts_manifest.py
+
+import hashlib
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+
+def message(s):
+    print('{}: {}'.format(threading.current_thread().name, s))
+
+
+class RestartDownload(Exception):
+    """续传失败，不完整的文件已经删除，应当不带Range重新请求"""
+
+
+class Manifest:
+    """以URL为键，记录ETag、Last-Modified、大小和内容哈希"""
+
+    def __init__(self, filename='enclosures.json'):
+        self.filename = filename
+        self._lock = threading.Lock()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+
+    def _save(self):
+        tmp = self.filename + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.filename)
+
+    def get(self, url):
+        with self._lock:
+            return dict(self.entries.get(url, {}))
+
+    def update(self, url, **fields):
+        with self._lock:
+            self.entries.setdefault(url, {}).update(fields)
+            self._save()
+
+    def prepare(self, url, filename):
+        """返回(请求头, 续传偏移量)"""
+        entry = self.get(url)
+        headers = {}
+        if entry.get('complete'):
+            try:
+                size = os.path.getsize(filename)
+            except OSError:
+                size = None
+            if size == entry['size']:
+                # 已经下载完成：条件请求，没有变化时只返回304响应头
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+            return headers, 0
+        validator = entry.get('etag') or entry.get('last_modified')
+        try:
+            offset = os.path.getsize(filename + '.part')
+        except OSError:
+            offset = 0
+        if offset and validator and not validator.startswith('W/'):
+            # 文件没有变化时只取剩下的部分，否则服务器会返回完整的200响应
+            headers['Range'] = 'bytes={}-'.format(offset)
+            headers['If-Range'] = validator
+            return headers, offset
+        return headers, 0
+
+    def start(self, url, filename, status, headers, offset):
+        """根据响应状态返回(写入模式, 哈希对象)，不需要下载时返回None"""
+        if status == 304:
+            return None
+        if status == 416 and offset:
+            # .part写完以后、改名之前进程退出时，续传的起点等于文件的长度
+            total = headers.get('content-range', '').rpartition('/')[2]
+            if total.isdigit() and int(total) == offset:
+                self.finish(url, filename, self._hash_part(filename))
+                return None
+            os.remove(filename + '.part')
+            raise RestartDownload(url)
+        if status == 206:
+            content_range = headers.get('content-range', '')
+            start = int(content_range.split()[1].partition('-')[0])
+            if start != offset:
+                raise RuntimeError('unexpected Content-Range: {}'.format(
+                    content_range))
+            return 'ab', self._hash_part(filename)
+        hasher = hashlib.sha256()
+        if status != 200:
+            raise RuntimeError('{} -> HTTP {}'.format(url, status))
+        self.update(
+            url,
+            etag=headers.get('etag'),
+            last_modified=headers.get('last-modified'),
+            complete=False,
+        )
+        return 'wb', hasher
+
+    def _hash_part(self, filename):
+        hasher = hashlib.sha256()
+        with open(filename + '.part', 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(block)
+        return hasher
+
+    def finish(self, url, filename, hasher):
+        os.replace(filename + '.part', filename)
+        size = os.path.getsize(filename)
+        self.update(url, size=size, sha256=hasher.hexdigest(), complete=True)
+        return size
+
+
+def download(url, manifest, dest='.'):
+    try:
+        return _download(url, manifest, dest)
+    except RestartDownload:
+        # 不完整的文件已经删除，这一次不会再带Range
+        return _download(url, manifest, dest)
+
+
+def _download(url, manifest, dest):
+    filename = os.path.join(dest, url.rpartition('/')[-1])
+    headers, offset = manifest.prepare(url, filename)
+    request = urllib.request.Request(
+        url, headers=dict(headers, **{'User-Agent': 'fetch_podcasts.py'}))
+    try:
+        response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as err:
+        if err.code not in (304, 416):
+            raise
+        response = err
+    with response:
+        response_headers = {k.lower(): v for k, v in response.headers.items()}
+        started = manifest.start(url, filename, response.status,
+                                 response_headers, offset)
+        if started is None:
+            return filename, None
+        mode, hasher = started
+        with open(filename + '.part', mode) as outfile:
+            for chunk in iter(lambda: response.read(64 * 1024), b''):
+                hasher.update(chunk)
+                outfile.write(chunk)
+    return filename, manifest.finish(url, filename, hasher)
+
+
+def download_enclosures(q, manifest):
+    while True:
+        url = q.get()
+        try:
+            filename, size = download(url, manifest)
+            if size is None:
+                message('unchanged {}'.format(filename))
+            else:
+                message('wrote {} bytes to {}'.format(size, filename))
+        except Exception as err:
+            # 线程退出后剩下的URL没有人处理，q.join()会一直等待
+            message('failed {}: {}'.format(url, err))
+        finally:
+            q.task_done()
@@ -0,0 +1,72 @@
+# fetch_podcasts_parallel.py
+
+import functools
+import multiprocessing
+from queue import Queue
+import threading
+
+import feedparser   # 第三方库
+
+from fetch_podcasts_manifest import download_enclosures, Manifest
+
+num_fetch_threads = 2
+num_parse_processes = None  # None表示使用os.cpu_count()个进程
+
+
+def message(s):
+    print('{}: {}'.format(threading.current_thread().name, s))
+
+
+def parse_feed(url, max_entries=5):
+    """在子进程中运行，只把需要的enclosure URL送回主进程"""
+    response = feedparser.parse(url, agent='fetch_podcasts.py')
+    return url, [
+        enclosure['url']
+        for entry in response['entries'][:max_entries]
+        for enclosure in entry.get('enclosures', [])
+    ]
+
+
+def queue_enclosures(feed_urls, q, pool, max_entries=5):
+    """每解析完一个feed就把它的enclosure放入下载队列
+
+    pool要在启动下载线程之前创建：在有多个线程的进程中fork，
+    子进程可能继承一把被别的线程(比如urllib中的SSL或socket)持有的锁而死锁。
+    """
+    count = 0
+    results = pool.imap_unordered(
+        functools.partial(parse_feed, max_entries=max_entries),
+        feed_urls,
+        chunksize=1,
+    )
+    for feed_url, enclosure_urls in results:
+        for url in enclosure_urls:
+            q.put(url)
+            count += 1
+    return count
+
+
+if __name__ == '__main__':
+    enclosure_queue = Queue()
+    manifest = Manifest('enclosures.json')
+
+    feed_urls = [
+        'http://talkpython.fm/episodes/rss'
+    ]
+
+    # 先创建进程池(fork子进程)，再启动下载线程；
+    # 下载线程在解析之前启动，这样第一个feed解析完就可以开始下载
+    with multiprocessing.Pool(num_parse_processes) as pool:
+        for i in range(num_fetch_threads):
+            worker = threading.Thread(
+                target=download_enclosures,
+                args=(enclosure_queue, manifest),
+                name='worker-{}'.format(i),
+                daemon=True,
+            )
+            worker.start()
+
+        count = queue_enclosures(feed_urls, enclosure_queue, pool)
+    message('*** queued {} enclosures, main thread waiting'.format(count))
+    enclosure_queue.join()
+    message('*** done')
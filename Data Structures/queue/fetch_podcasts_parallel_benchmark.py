@@ -0,0 +1,89 @@
+# fetch_podcasts_parallel_benchmark.py
+
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+from fetch_podcasts_parallel import parse_feed, queue_enclosures
+
+ITEM = '''
+<item>
+  <title>Episode {n}</title>
+  <link>http://example.com/{feed}/{n}</link>
+  <description>{text}</description>
+  <pubDate>Mon, 02 Jan 2017 10:00:00 GMT</pubDate>
+  <enclosure url="http://example.com/{feed}/episode{n}.mp3"
+             length="1000" type="audio/mpeg"/>
+</item>'''
+
+
+def write_fixtures(dirname, num_feeds, num_items):
+    text = 'Show notes with &lt;b&gt;markup&lt;/b&gt;. ' * 20
+    paths = []
+    for feed in range(num_feeds):
+        items = ''.join(ITEM.format(feed=feed, n=n, text=text)
+                        for n in range(num_items))
+        path = os.path.join(dirname, 'feed{}.xml'.format(feed))
+        with open(path, 'w') as f:
+            f.write('<?xml version="1.0"?><rss version="2.0"><channel>'
+                    '<title>Feed {}</title>{}</channel></rss>'.format(
+                        feed, items))
+        paths.append(path)
+    return paths
+
+
+def start_downloader(q, delay, first):
+    # 模拟下载：每个enclosure需要delay秒
+    def download(q):
+        while True:
+            q.get()
+            first.setdefault('t', time.perf_counter())
+            time.sleep(delay)
+            q.task_done()
+
+    for i in range(2):
+        threading.Thread(target=download, args=(q,), daemon=True).start()
+
+
+def serial(feeds, delay):
+    q, first = queue.Queue(), {}
+    start = time.perf_counter()
+    # 与fetch_podcasts.py相同：在主线程中逐个解析，全部解析完才开始下载
+    urls = [url for feed in feeds for url in parse_feed(feed)[1]]
+    start_downloader(q, delay, first)
+    for url in urls:
+        q.put(url)
+    q.join()
+    return first['t'] - start, time.perf_counter() - start
+
+
+def streamed(feeds, delay, processes):
+    q, first = queue.Queue(), {}
+    start = time.perf_counter()
+    # 在启动下载线程之前fork
+    with multiprocessing.Pool(processes) as pool:
+        start_downloader(q, delay, first)
+        queue_enclosures(feeds, q, pool)
+    q.join()
+    return first['t'] - start, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    num_feeds = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    delay = 0.002
+    with tempfile.TemporaryDirectory() as dirname:
+        feeds = write_fixtures(dirname, num_feeds, 100)
+        print('{} feeds, {} CPUs'.format(num_feeds, os.cpu_count()))
+        print('{:<14} {:>14} {:>10}'.format(
+            'mode', 'first dl (s)', 'total (s)'))
+        runs = [('serial', lambda: serial(feeds, delay))]
+        for processes in sorted({1, 2, os.cpu_count()}):
+            runs.append(('pool({})'.format(processes),
+                         lambda p=processes: streamed(feeds, delay, p)))
+        for label, run in runs:
+            first, total = run()
+            print('{:<14} {:>14.3f} {:>10.2f}'.format(label, first, total))
@@ -0,0 +1,109 @@
+# fetch_podcasts_resume.py
+
+import asyncio
+import hashlib
+import http.server
+import os
+import tempfile
+import threading
+
+from fetch_podcasts_asyncio import ConnectionPool, download as adownload
+from fetch_podcasts_manifest import Manifest, download
+
+CONTENT = bytes(range(256)) * 4096
+ETAG = '"{}"'.format(hashlib.md5(CONTENT).hexdigest())
+sent = {'bytes': 0}
+
+
+class StaticHandler(http.server.BaseHTTPRequestHandler):
+    """支持ETag、If-None-Match、Range和If-Range的静态文件服务器"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', ETAG) == ETAG:
+            start = int(range_header.partition('=')[2].partition('-')[0])
+            if start >= len(CONTENT):
+                self.send_response(416)
+                self.send_header('Content-Range',
+                                 'bytes */{}'.format(len(CONTENT)))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                start, len(CONTENT) - 1, len(CONTENT)))
+        else:
+            self.send_response(200)
+        body = CONTENT[start:]
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        sent['bytes'] += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(label, fetch):
+    sent['bytes'] = 0
+    filename, size = fetch()
+    print('{:<10} size={!s:<8} body bytes sent={}'.format(
+        label, size, sent['bytes']))
+
+
+server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StaticHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+url = 'http://127.0.0.1:{}/episode.mp3'.format(server.server_address[1])
+
+with tempfile.TemporaryDirectory() as dest:
+    manifest = Manifest(os.path.join(dest, 'enclosures.json'))
+    filename = os.path.join(dest, 'episode.mp3')
+
+    run('first', lambda: download(url, manifest, dest))
+    run('again', lambda: download(url, manifest, dest))
+
+    # 模拟一次中断的下载：只留下前四分之一
+    with open(filename, 'rb') as f:
+        partial = f.read(len(CONTENT) // 4)
+    os.remove(filename)
+    with open(filename + '.part', 'wb') as f:
+        f.write(partial)
+    manifest.update(url, complete=False)
+    run('resume', lambda: download(url, manifest, dest))
+
+    def leave_part(data):
+        os.remove(filename)
+        with open(filename + '.part', 'wb') as f:
+            f.write(data)
+        manifest.update(url, complete=False)
+
+    # 写完了.part但是没有改名：服务器对续传返回416
+    leave_part(CONTENT)
+    run('unrenamed', lambda: download(url, manifest, dest))
+
+    async def again_async():
+        pool = ConnectionPool()
+        try:
+            return await adownload(pool, url, dest, manifest)
+        finally:
+            pool.close()
+
+    run('asyncio', lambda: asyncio.run(again_async()))
+    # 比完整的文件还长的.part：删除后重新下载
+    leave_part(CONTENT + b'junk')
+    run('too long', lambda: asyncio.run(again_async()))
+
+    entry = manifest.get(url)
+    print('etag     :', entry['etag'])
+    print('sha256 ok:', entry['sha256'] == hashlib.sha256(CONTENT).hexdigest())
+
+server.shutdown()
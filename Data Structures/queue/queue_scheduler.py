@@ -0,0 +1,147 @@
+# queue_scheduler.py
+
+import heapq
+import itertools
+import queue
+import time
+
+
+class Job:
+
+    def __init__(self, priority, description, tenant='default'):
+        self.priority = priority
+        self.description = description
+        self.tenant = tenant
+
+    def __repr__(self):
+        return 'Job({!r}, {!r}, {!r})'.format(
+            self.priority, self.description, self.tenant)
+
+
+class FairScheduler(queue.Queue):
+    """带优先级老化和按租户加权轮转的优先级队列
+
+    像PriorityQueue一样，通过覆盖Queue的_init()、_qsize()、_put()和_get()
+    实现，所以put()、get()、join()和task_done()的加锁和阻塞行为都不变。
+    """
+
+    REMOVED = None
+
+    def __init__(self, maxsize=0, weights=None, aging=0.0,
+                 clock=time.monotonic):
+        self.weights = dict(weights or {})
+        self.aging = aging
+        self.clock = clock
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._heaps = {}        # tenant -> 该租户的堆
+        self._live = {}         # tenant -> 未取消的任务数
+        self._current = {}      # 平滑加权轮转的当前权重
+        self._entries = {}      # job -> 堆中的条目
+        self._counter = itertools.count()
+        self._count = 0
+
+    def _qsize(self):
+        return self._count
+
+    def _key(self, job):
+        # 有效优先级 priority - aging * (now - enqueued) 随时间变化，
+        # 但任意两个任务之间的先后顺序不变，所以可以用
+        # priority + aging * enqueued 作为固定的堆键
+        return job.priority + self.aging * self.clock()
+
+    def _put(self, job):
+        # 条目按任务对象保存，同一个任务排队两次会让计数和条目对不上
+        if job in self._entries:
+            raise ValueError('job is already queued: {!r}'.format(job))
+        entry = [self._key(job), next(self._counter), job]
+        tenant = job.tenant
+        if tenant not in self._heaps:
+            self._heaps[tenant] = []
+            self._live[tenant] = 0
+            self._current[tenant] = 0
+        heapq.heappush(self._heaps[tenant], entry)
+        self._entries[job] = entry
+        self._live[tenant] += 1
+        self._count += 1
+
+    def _pick_tenant(self):
+        total = 0
+        best = None
+        for tenant, live in self._live.items():
+            if not live:
+                continue
+            weight = self.weights.get(tenant, 1)
+            self._current[tenant] += weight
+            total += weight
+            if best is None or self._current[tenant] > self._current[best]:
+                best = tenant
+        self._current[best] -= total
+        return best
+
+    def _get(self):
+        tenant = self._pick_tenant()
+        heap = self._heaps[tenant]
+        while True:
+            key, count, job = heapq.heappop(heap)
+            if job is not self.REMOVED:
+                break
+        del self._entries[job]
+        self._live[tenant] -= 1
+        self._count -= 1
+        return job
+
+    def _remove(self, job):
+        entry = self._entries.pop(job)
+        entry[-1] = self.REMOVED
+        self._live[job.tenant] -= 1
+        self._count -= 1
+
+    def cancel(self, job):
+        """删除一个还在排队的任务，找不到时引发KeyError"""
+        with self.mutex:
+            self._remove(job)
+            self.unfinished_tasks -= 1
+            if not self.unfinished_tasks:
+                self.all_tasks_done.notify_all()
+            self.not_full.notify()
+
+    def reprioritize(self, job, priority):
+        """修改还在排队的任务的优先级，排队时间从现在重新计算"""
+        with self.mutex:
+            self._remove(job)
+            job.priority = priority
+            self._put(job)
+
+
+if __name__ == '__main__':
+    now = [0.0]
+    q = FairScheduler(weights={'payroll': 2, 'dev': 1}, aging=1.0,
+                      clock=lambda: now[0])
+
+    for i in range(4):
+        q.put(Job(1, 'payroll report {}'.format(i), 'payroll'))
+        q.put(Job(5, 'code listing {}'.format(i), 'dev'))
+    q.put(Job(10, 'old low-level job', 'dev'))
+
+    now[0] = 12.0
+    for i in range(2):
+        q.put(Job(1, 'new important job {}'.format(i), 'dev'))
+
+    doomed = Job(1, 'cancelled job', 'payroll')
+    q.put(doomed)
+    q.cancel(doomed)
+    late = Job(20, 'bumped job', 'payroll')
+    q.put(late)
+    q.reprioritize(late, 0)
+    try:
+        q.put(late)
+    except ValueError as err:
+        print('ERROR:', err)
+
+    while not q.empty():
+        job = q.get()
+        print('{:<8} {:>3} {}'.format(job.tenant, job.priority,
+                                      job.description))
+        q.task_done()
@@ -0,0 +1,52 @@
+# queue_scheduler_benchmark.py
+
+import queue
+import random
+import sys
+import time
+
+from queue_scheduler import FairScheduler, Job
+
+
+def percentiles(samples):
+    samples.sort()
+    n = len(samples)
+    return ' '.join(
+        '{}={:.1f}us'.format(name, samples[min(int(n * p), n - 1)] / 1000)
+        for name, p in [('p50', 0.5), ('p99', 0.99), ('p99.9', 0.999)]
+    )
+
+
+def timed(label, ops, func):
+    latencies = []
+    clock = time.perf_counter_ns
+    start = clock()
+    for op in ops:
+        t = clock()
+        func(op)
+        latencies.append(clock() - t)
+    elapsed = (clock() - start) / 1e9
+    print('{:<22} {:>10,.0f} ops/s  {}'.format(
+        label, len(latencies) / elapsed, percentiles(latencies)))
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+random.seed(2016)
+tenants = ['tenant-{}'.format(i) for i in range(8)]
+jobs = [Job(random.randint(1, 100), i, random.choice(tenants))
+        for i in range(n)]
+print('{:,} queued jobs, {} tenants'.format(n, len(tenants)))
+
+pq = queue.PriorityQueue()
+timed('PriorityQueue.put', jobs,
+      lambda job: pq.put((job.priority, job.description)))
+timed('PriorityQueue.get', range(n), lambda _: pq.get_nowait())
+
+q = FairScheduler(weights={t: i + 1 for i, t in enumerate(tenants)},
+                  aging=0.001)
+timed('FairScheduler.put', jobs, q.put)
+sample = random.sample(jobs, n // 10)
+timed('reprioritize', sample[:n // 20],
+      lambda job: q.reprioritize(job, random.randint(1, 100)))
+timed('cancel', sample[n // 20:], q.cancel)
+timed('FairScheduler.get', range(q.qsize()), lambda _: q.get_nowait())
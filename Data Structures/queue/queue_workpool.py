@@ -0,0 +1,186 @@
+# queue_workpool.py
+
+import collections
+import queue
+import threading
+import time
+
+HISTORY = 1000
+
+
+class Worker(threading.Thread):
+
+    def __init__(self, pool, name):
+        super().__init__(name=name, daemon=True)
+        self.pool = pool
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+        self.busy = 0.0
+        self.tasks = 0
+
+    def run(self):
+        pool = self.pool
+        while not pool._should_retire():
+            try:
+                enqueued, item = pool._queue.get(timeout=pool.interval)
+            except queue.Empty:
+                continue
+            start = time.monotonic()
+            try:
+                pool.func(item)
+            except Exception:
+                with pool._lock:
+                    pool.errors += 1
+            finally:
+                end = time.monotonic()
+                self.busy += end - start
+                self.tasks += 1
+                pool._record(start - enqueued)
+                pool._queue.task_done()
+        self.stopped_at = time.monotonic()
+
+    def utilization(self):
+        end = self.stopped_at or time.monotonic()
+        return self.busy / max(end - self.started_at, 1e-9)
+
+
+class WorkPool:
+    """有界队列加上按排队延迟和吞吐量自动伸缩的工作线程"""
+
+    def __init__(self, func, min_workers=1, max_workers=8, maxsize=100,
+                 target_latency=0.05, interval=0.1):
+        if min_workers < 1:
+            # 没有工作线程时排队延迟无从测量，控制器也无法按吞吐量决定是否增长
+            raise ValueError('min_workers must be at least 1')
+        self.func = func
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_latency = target_latency
+        self.interval = interval
+        self.errors = 0
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._waits = []
+        self._done = 0
+        self._retire = 0
+        self._workers = []
+        self._all_workers = []
+        self._closed = threading.Event()
+        # 控制器每个周期记录一次，只保留最近的HISTORY条
+        self.history = collections.deque(maxlen=HISTORY)
+        self.peak_workers = 0
+        for _ in range(min_workers):
+            self._grow()
+        self._controller = threading.Thread(
+            target=self._control, name='controller', daemon=True)
+        self._controller.start()
+
+    def submit(self, item, block=True, timeout=None):
+        # 队列满时put()阻塞生产者，这就是背压
+        self._queue.put((time.monotonic(), item), block, timeout)
+
+    def join(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.join()
+        self._closed.set()
+        self._controller.join()
+        with self._lock:
+            self._retire = len(self._workers)
+        for w in list(self._workers):
+            w.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def num_workers(self):
+        return len(self._workers) - self._retire
+
+    def stats(self):
+        return [
+            (w.name, w.tasks, w.utilization())
+            for w in self._all_workers
+        ]
+
+    def _record(self, wait):
+        with self._lock:
+            self._waits.append(wait)
+            self._done += 1
+
+    def _should_retire(self):
+        with self._lock:
+            if self._retire:
+                self._retire -= 1
+                self._workers.remove(threading.current_thread())
+                return True
+        return False
+
+    def _grow(self):
+        w = Worker(self, 'worker-{}'.format(len(self._all_workers)))
+        self._workers.append(w)
+        self._all_workers.append(w)
+        w.start()
+        self.peak_workers = max(self.peak_workers, self.num_workers)
+
+    def _shrink(self):
+        with self._lock:
+            self._retire += 1
+
+    def _control(self):
+        last_action = None
+        last_throughput = 0.0
+        hold = 0
+        while not self._closed.wait(self.interval):
+            with self._lock:
+                waits, self._waits = self._waits, []
+                done, self._done = self._done, 0
+            throughput = done / self.interval
+            latency = sum(waits) / len(waits) if waits else 0.0
+            if not waits and self._queue.qsize():
+                # 所有工作线程都卡在长任务里，没有任务完成
+                latency = self.target_latency * 2
+            busy = self._queue.qsize() > 0 or latency > self.target_latency
+            action = None
+            if hold:
+                hold -= 1
+            elif busy and self.num_workers < self.max_workers:
+                # n个线程再加一个，理想情况下吞吐量增加1/n
+                expected = 1 + 0.5 / self.num_workers
+                if (last_action == 'grow' and
+                        throughput < last_throughput * expected):
+                    # 增加线程没有带来更高的吞吐量(例如CPU密集的任务)
+                    self._shrink()
+                    action = 'undo'
+                    hold = 5
+                else:
+                    self._grow()
+                    action = 'grow'
+            elif (not busy and latency < self.target_latency / 2 and
+                  self.num_workers > self.min_workers and
+                  throughput < last_throughput * 0.9 + 1):
+                self._shrink()
+                action = 'shrink'
+            self.history.append(
+                (round(latency, 4), round(throughput), self.num_workers))
+            last_action = action
+            last_throughput = throughput
+
+
+if __name__ == '__main__':
+
+    def handle(item):
+        time.sleep(0.01)
+
+    with WorkPool(handle, max_workers=8, maxsize=20) as pool:
+        for i in range(500):
+            pool.submit(i)
+        print('workers while busy:', pool.num_workers)
+
+    print('{:<10} {:>6} {:>12}'.format('worker', 'tasks', 'utilization'))
+    for name, tasks, utilization in pool.stats():
+        print('{:<10} {:>6} {:>11.0%}'.format(name, tasks, utilization))
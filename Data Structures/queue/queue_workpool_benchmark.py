@@ -0,0 +1,41 @@
+# queue_workpool_benchmark.py
+
+import sys
+import time
+
+from queue_workpool import WorkPool
+
+
+def io_task(item):
+    time.sleep(0.005)
+
+
+def cpu_task(item):
+    total = 0
+    for i in range(20000):
+        total += i * i
+    return total
+
+
+def run(func, count, min_workers, max_workers):
+    start = time.perf_counter()
+    with WorkPool(func, min_workers, max_workers, maxsize=50) as pool:
+        for i in range(count):
+            pool.submit(i)
+    elapsed = time.perf_counter() - start
+    stats = pool.stats()
+    peak = pool.peak_workers
+    utilization = sum(u for _, tasks, u in stats if tasks) / max(
+        sum(1 for _, tasks, _ in stats if tasks), 1)
+    return elapsed, peak, utilization
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+print('{:<5} {:<12} {:>8} {:>10} {:>13}'.format(
+    'task', 'workers', 'time(s)', 'peak', 'utilization'))
+for name, func in [('io', io_task), ('cpu', cpu_task)]:
+    for label, lo, hi in [('fixed 2', 2, 2), ('fixed 16', 16, 16),
+                          ('auto 1-16', 1, 16)]:
+        elapsed, peak, utilization = run(func, count, lo, hi)
+        print('{:<5} {:<12} {:>8.2f} {:>10} {:>12.0%}'.format(
+            name, label, elapsed, peak, utilization))
@@ -0,0 +1,272 @@
+# struct_schema.py
+
+import functools
+import struct
+
+# 字符串的长度和重复组的个数用的格式
+LENGTH = 'I'
+
+
+class _Writer:
+    """生成函数源代码时累积相邻的定长字段，需要时合并成一次Struct调用"""
+
+    def __init__(self, namespace, byteorder):
+        self.namespace = namespace
+        self.byteorder = byteorder
+        self.lines = []
+        self.indent = 1
+        self.codes = []
+        self.args = []
+        self.counter = 0
+
+    def emit(self, line):
+        self.lines.append('    ' * self.indent + line)
+
+    def var(self, prefix='_v'):
+        self.counter += 1
+        return '{}{}'.format(prefix, self.counter)
+
+    def struct(self):
+        """返回当前累积的格式对应的Struct在命名空间中的名称，相同的格式共用"""
+        fmt = self.byteorder + ''.join(self.codes)
+        structs = self.namespace.setdefault('_structs', {})
+        if fmt not in structs:
+            structs[fmt] = name = '_S{}'.format(len(structs))
+            self.namespace[name] = struct.Struct(fmt)
+        return structs[fmt]
+
+
+class _PackWriter(_Writer):
+
+    def __init__(self, namespace, byteorder, into):
+        super().__init__(namespace, byteorder)
+        self.into = into
+
+    def flush(self):
+        if not self.codes:
+            return
+        name = self.struct()
+        args = ', '.join(self.args)
+        if self.into:
+            self.emit('{}.pack_into(buf, pos, {})'.format(name, args))
+            self.emit('pos += {}'.format(self.namespace[name].size))
+        else:
+            self.emit('out += {}.pack({})'.format(name, args))
+        self.codes, self.args = [], []
+
+    def write_bytes(self, expr):
+        if self.into:
+            self.emit('buf[pos:pos + len({0})] = {0}'.format(expr))
+            self.emit('pos += len({})'.format(expr))
+        else:
+            self.emit('out += {}'.format(expr))
+
+    def value(self, spec, expr):
+        if isinstance(spec, list):
+            for name, field in spec:
+                self.value(field, '{}[{!r}]'.format(expr, name))
+        elif spec in ('str', 'bytes'):
+            data = self.var()
+            self.emit('{} = {}{}'.format(
+                data, expr, ".encode('utf-8')" if spec == 'str' else ''))
+            self.codes.append(LENGTH)
+            self.args.append('len({})'.format(data))
+            self.flush()
+            self.write_bytes(data)
+        elif spec[0] == 'optional':
+            value = self.var()
+            self.emit('{} = {}'.format(value, expr))
+            self.codes.append('?')
+            self.args.append('{} is not None'.format(value))
+            self.flush()
+            self.emit('if {} is not None:'.format(value))
+            self.indent += 1
+            self.value(spec[1], value)
+            self.flush()
+            self.indent -= 1
+        elif spec[0] == 'repeated':
+            items, item = self.var(), self.var('_item')
+            self.emit('{} = {}'.format(items, expr))
+            self.codes.append(LENGTH)
+            self.args.append('len({})'.format(items))
+            self.flush()
+            self.emit('for {} in {}:'.format(item, items))
+            self.indent += 1
+            self.value(spec[1], item)
+            self.flush()
+            self.indent -= 1
+        else:
+            self.codes.append(spec)
+            self.args.append(expr)
+
+
+class _UnpackWriter(_Writer):
+
+    def flush(self):
+        if not self.codes:
+            return
+        name = self.struct()
+        self.emit('{}, = {}.unpack_from(buf, pos)'.format(
+            ', '.join(self.args), name))
+        self.emit('pos += {}'.format(self.namespace[name].size))
+        self.codes, self.args = [], []
+
+    def value(self, spec, target):
+        if isinstance(spec, list):
+            names = [(name, self.var()) for name, _ in spec]
+            for (name, var), (_, field) in zip(names, spec):
+                self.value(field, var)
+            self.flush()
+            self.emit('{} = {{{}}}'.format(target, ', '.join(
+                '{!r}: {}'.format(name, var) for name, var in names)))
+        elif spec in ('str', 'bytes'):
+            length = self.var('_n')
+            self.codes.append(LENGTH)
+            self.args.append(length)
+            self.flush()
+            # 切片不检查长度，截断的数据会被悄悄解码成较短的值
+            self.emit('if pos + {} > len(buf):'.format(length))
+            self.emit("    raise ValueError('truncated {} of {{}} bytes at "
+                      "offset {{}}'.format({}, pos))".format(spec, length))
+            if spec == 'str':
+                self.emit("{} = str(buf[pos:pos + {}], 'utf-8')".format(
+                    target, length))
+            else:
+                self.emit('{} = bytes(buf[pos:pos + {}])'.format(
+                    target, length))
+            self.emit('pos += {}'.format(length))
+        elif spec[0] == 'optional':
+            present = self.var('_p')
+            self.codes.append('?')
+            self.args.append(present)
+            self.flush()
+            self.emit('if {}:'.format(present))
+            self.indent += 1
+            self.value(spec[1], target)
+            self.flush()
+            self.indent -= 1
+            self.emit('else:')
+            self.emit('    {} = None'.format(target))
+        elif spec[0] == 'repeated':
+            count, item = self.var('_n'), self.var('_item')
+            self.codes.append(LENGTH)
+            self.args.append(count)
+            self.flush()
+            self.emit('{} = []'.format(target))
+            self.emit('for _ in range({}):'.format(count))
+            self.indent += 1
+            self.value(spec[1], item)
+            self.flush()
+            self.emit('{}.append({})'.format(target, item))
+            self.indent -= 1
+        else:
+            self.codes.append(spec)
+            self.args.append(target)
+
+
+class Codec:
+    """由compile_schema()生成的编解码器
+
+    pack(record)返回bytes；pack_into(buffer, offset, record)写入预先分配的
+    缓冲区并返回结束的位置；unpack_from(buffer, offset)返回(record, 结束的位置)。
+    source保存生成的源代码。
+    """
+
+    def __init__(self, schema, byteorder):
+        namespace = {}
+        pack = _PackWriter(namespace, byteorder, into=False)
+        pack.value(schema, 'record')
+        pack.flush()
+        pack_into = _PackWriter(namespace, byteorder, into=True)
+        pack_into.value(schema, 'record')
+        pack_into.flush()
+        unpack = _UnpackWriter(namespace, byteorder)
+        unpack.value(schema, 'record')
+        self.source = '\n'.join(
+            ['def pack(record):', '    out = bytearray()'] + pack.lines +
+            ['    return bytes(out)',
+             'def pack_into(buffer, pos, record):',
+             # 写入memoryview，越界时引发异常而不是让bytearray变长
+             '    with memoryview(buffer) as buf:'] +
+            ['    ' + line for line in pack_into.lines] +
+            ['    return pos',
+             'def unpack_from(buf, pos=0):'] + unpack.lines +
+            ['    return record, pos', ''])
+        exec(self.source, namespace)
+        self.pack = namespace['pack']
+        self.pack_into = namespace['pack_into']
+        self.unpack_from = namespace['unpack_from']
+        self.structs = namespace['_structs']
+
+    def unpack(self, buffer):
+        record, pos = self.unpack_from(buffer)
+        if pos != len(buffer):
+            raise ValueError('{} extra bytes after record'.format(
+                len(buffer) - pos))
+        return record
+
+
+def _freeze(spec):
+    """把schema转换成可以哈希的形式，作为缓存的键"""
+    if isinstance(spec, (list, tuple)):
+        return tuple(_freeze(item) for item in spec)
+    return spec
+
+
+def _thaw(spec):
+    if isinstance(spec, tuple):
+        if spec and spec[0] in ('optional', 'repeated'):
+            return (spec[0], _thaw(spec[1]))
+        return [(name, _thaw(field)) for name, field in spec]
+    return spec
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(frozen, byteorder):
+    return Codec(_thaw(frozen), byteorder)
+
+
+def compile_schema(schema, byteorder='<'):
+    """编译一个schema，相同的schema只编译一次
+
+    schema是(字段名, 类型)的列表。类型可以是struct的格式字符(比如'I'、'd'、
+    '4s')，'str'或者'bytes'(带长度前缀)，('optional', 类型)，
+    ('repeated', 类型)，或者表示嵌套记录的另一个列表。
+    """
+    return _compile(_freeze(schema), byteorder)
+
+
+if __name__ == '__main__':
+    schema = [
+        ('id', 'I'),
+        ('temperature', 'd'),
+        ('name', 'str'),
+        ('unit', ('optional', 'str')),
+        ('tags', ('repeated', 'str')),
+        ('points', ('repeated', [('x', 'h'), ('y', 'h')])),
+        ('checksum', 'H'),
+    ]
+    codec = compile_schema(schema)
+    print('Cached:', compile_schema(schema) is codec)
+    print('Structs:', codec.structs)
+    print()
+    print(codec.source[:codec.source.index('def pack_into')])
+
+    record = {'id': 7, 'temperature': 21.5, 'name': 'sensor-7',
+              'unit': None, 'tags': ['roof', 'north'],
+              'points': [{'x': 1, 'y': 2}, {'x': -3, 'y': 4}],
+              'checksum': 0xBEEF}
+    data = codec.pack(record)
+    print('Packed  :', len(data), 'bytes')
+    print('Unpacked:', codec.unpack(data))
+    print('Same?   :', codec.unpack(data) == record)
+
+    buffer = bytearray(100)
+    end = codec.pack_into(buffer, 10, dict(record, unit='C'))
+    print('\npack_into: bytes 10 to', end)
+    print(codec.unpack_from(buffer, 10))
+
+    try:
+        codec.unpack_from(data[:16])
+    except ValueError as err:
+        print('\nERROR:', err)
@@ -0,0 +1,140 @@
+# struct_schema_benchmark.py
+
+import pickle
+import random
+import struct
+import sys
+import time
+
+from struct_schema import compile_schema
+
+SCHEMA = [
+    ('id', 'I'),
+    ('timestamp', 'Q'),
+    ('temperature', 'd'),
+    ('humidity', 'f'),
+    ('name', 'str'),
+    ('unit', ('optional', 'str')),
+    ('points', ('repeated', [('x', 'h'), ('y', 'h')])),
+    ('checksum', 'H'),
+]
+
+U32 = struct.Struct('<I')
+U64 = struct.Struct('<Q')
+F64 = struct.Struct('<d')
+F32 = struct.Struct('<f')
+U16 = struct.Struct('<H')
+I16 = struct.Struct('<h')
+FLAG = struct.Struct('<?')
+
+
+def hand_pack(record):
+    """逐个字段调用struct，与生成的代码产生相同的字节"""
+    out = bytearray()
+    out += U32.pack(record['id'])
+    out += U64.pack(record['timestamp'])
+    out += F64.pack(record['temperature'])
+    out += F32.pack(record['humidity'])
+    name = record['name'].encode('utf-8')
+    out += U32.pack(len(name))
+    out += name
+    unit = record['unit']
+    out += FLAG.pack(unit is not None)
+    if unit is not None:
+        unit = unit.encode('utf-8')
+        out += U32.pack(len(unit))
+        out += unit
+    out += U32.pack(len(record['points']))
+    for point in record['points']:
+        out += I16.pack(point['x'])
+        out += I16.pack(point['y'])
+    out += U16.pack(record['checksum'])
+    return bytes(out)
+
+
+def hand_unpack(data):
+    pos = 0
+    record = {}
+    record['id'], = U32.unpack_from(data, pos)
+    pos += 4
+    record['timestamp'], = U64.unpack_from(data, pos)
+    pos += 8
+    record['temperature'], = F64.unpack_from(data, pos)
+    pos += 8
+    record['humidity'], = F32.unpack_from(data, pos)
+    pos += 4
+    length, = U32.unpack_from(data, pos)
+    pos += 4
+    record['name'] = data[pos:pos + length].decode('utf-8')
+    pos += length
+    present, = FLAG.unpack_from(data, pos)
+    pos += 1
+    if present:
+        length, = U32.unpack_from(data, pos)
+        pos += 4
+        record['unit'] = data[pos:pos + length].decode('utf-8')
+        pos += length
+    else:
+        record['unit'] = None
+    count, = U32.unpack_from(data, pos)
+    pos += 4
+    points = []
+    for _ in range(count):
+        x, = I16.unpack_from(data, pos)
+        y, = I16.unpack_from(data, pos + 2)
+        pos += 4
+        points.append({'x': x, 'y': y})
+    record['points'] = points
+    record['checksum'], = U16.unpack_from(data, pos)
+    return record
+
+
+def make_records(count):
+    random.seed(2016)
+    return [{'id': i, 'timestamp': 1500000000000 + i,
+             'temperature': random.random() * 40,
+             'humidity': 0.5,
+             'name': 'sensor-{}'.format(i % 100),
+             'unit': 'C' if i % 2 else None,
+             'points': [{'x': j, 'y': -j} for j in range(i % 4)],
+             'checksum': i % 65536}
+            for i in range(count)]
+
+
+def timed(func, items):
+    start = time.perf_counter()
+    result = [func(item) for item in items]
+    return len(items) / (time.perf_counter() - start), result
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+records = make_records(count)
+codec = compile_schema(SCHEMA)
+assert codec.pack(records[3]) == hand_pack(records[3])
+
+
+def pickle_dumps(record):
+    return pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+print('{:<12} {:>14} {:>14} {:>12}'.format(
+    'codec', 'pack(rec/s)', 'unpack(rec/s)', 'bytes/rec'))
+for name, pack, unpack in [('compiled', codec.pack, codec.unpack),
+                           ('hand-written', hand_pack, hand_unpack),
+                           ('pickle', pickle_dumps, pickle.loads)]:
+    packed_rate, packed = timed(pack, records)
+    unpacked_rate, unpacked = timed(unpack, packed)
+    assert unpacked == records, name
+    print('{:<12} {:>14,.0f} {:>14,.0f} {:>12.1f}'.format(
+        name, packed_rate, unpacked_rate,
+        sum(map(len, packed)) / count))
+
+# pack_into：所有记录写入同一个预先分配的缓冲区
+buffer = bytearray(sum(len(codec.pack(r)) for r in records))
+start = time.perf_counter()
+pos = 0
+pack_into = codec.pack_into
+for record in records:
+    pos = pack_into(buffer, pos, record)
+rate = count / (time.perf_counter() - start)
+print('{:<12} {:>14,.0f}'.format('pack_into', rate))
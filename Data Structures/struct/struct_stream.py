@@ -0,0 +1,167 @@
+# struct_stream.py
+
+import array
+import re
+import struct
+import sys
+
+BLOCK_SIZE = 1024 * 1024
+# 标准大小的struct格式 -> 能容纳它的array typecode
+# '?'不在其中：放入array('B')会变成整数(非零字节保留原来的值)，
+# 而iter_unpack()返回True/False，所以它和字符串一样保存在列表中
+ARRAY_TYPECODES = {
+    'b': 'b', 'B': 'B', 'h': 'h', 'H': 'H',
+    'i': 'i', 'I': 'I', 'l': 'i', 'L': 'I', 'q': 'q', 'Q': 'Q',
+    'e': 'f', 'f': 'f', 'd': 'd', 'n': 'q', 'N': 'Q', 'P': 'Q',
+}
+# 本机模式下'l'和'L'与C的long大小相同
+NATIVE_TYPECODES = dict(ARRAY_TYPECODES, l='l', L='L')
+FIELD = re.compile(r'(\d*)([xcbB?hHiIlLqQnNefdspP])')
+
+
+class RecordReader:
+    """按块读取定长记录的文件，每一块用Struct.iter_unpack()解码
+
+    数据读入一个重复使用的bytearray，解码通过memoryview进行，不复制数据。
+    跨越两块边界的记录的前半部分被移到缓冲区的开头，与下一块拼接起来。
+    """
+
+    def __init__(self, f, format, block_size=BLOCK_SIZE):
+        self.f = f
+        if not isinstance(format, struct.Struct):
+            format = struct.Struct(format)
+        self.struct = format
+        # 缓冲区至少能放下一条记录
+        self.block_size = max(block_size, format.size)
+        self._buffer = bytearray(self.block_size)
+
+    def blocks(self):
+        """产生只包含完整记录的memoryview；下一次迭代时内容会被覆盖"""
+        size = self.struct.size
+        readinto = self.f.readinto
+        with memoryview(self._buffer) as view:
+            carry = 0
+            while True:
+                read = readinto(view[carry:])
+                if not read:
+                    break
+                filled = carry + read
+                usable = filled - filled % size
+                if usable:
+                    with view[:usable] as block:
+                        yield block
+                carry = filled - usable
+                view[:carry] = view[usable:filled]
+            if carry:
+                raise ValueError('truncated record: {} trailing bytes'.format(
+                    carry))
+
+    def __iter__(self):
+        iter_unpack = self.struct.iter_unpack
+        for block in self.blocks():
+            yield from iter_unpack(block)
+
+    def records(self, record_type):
+        """产生record_type(比如namedtuple)的实例"""
+        make = record_type._make
+        for block in self.blocks():
+            yield from map(make, self.struct.iter_unpack(block))
+
+    def _layout(self):
+        """每个字段的(偏移, 大小, 格式字符)，包括本机模式下的对齐填充"""
+        format = self.struct.format
+        byteorder = format[0] if format[:1] in '@=<>!' else '@'
+        prefix = byteorder
+        layout = []
+        for count, code in FIELD.findall(format.lstrip('@=<>!')):
+            count = int(count or 1)
+            # '10s'是一个字段，'3i'是三个字段
+            items = ['{}{}'.format(count, code)] if code in 'sp' \
+                else [code] * count
+            for item in items:
+                prefix += item
+                if code == 'x':
+                    continue
+                size = struct.calcsize(byteorder + item)
+                layout.append((struct.calcsize(prefix) - size, size, code))
+        return layout
+
+    def column_types(self):
+        """每个字段的array typecode；不能放入数组的字段为None，保存在列表中"""
+        format = self.struct.format
+        typecodes = NATIVE_TYPECODES
+        if format[:1] in '=<>!':
+            typecodes = ARRAY_TYPECODES
+        types = []
+        for offset, size, code in self._layout():
+            typecode = typecodes.get(code)
+            if typecode and array.array(typecode).itemsize != size:
+                typecode = None
+            types.append(typecode)
+        return types
+
+    def columns(self):
+        """把所有记录按列读入，返回列的列表
+
+        数值字段不经过元组：对每个字节位置用步长切片把这一列的字节
+        从缓冲区中取出来，再用frombytes()放入array.array。
+        """
+        layout = self._layout()
+        types = self.column_types()
+        columns = [array.array(t) if t else [] for t in types]
+        order = self.struct.format[:1]
+        swap = (order == '<' and sys.byteorder == 'big' or
+                order in '>!' and sys.byteorder == 'little')
+        others = [i for i, t in enumerate(types) if t is None]
+        size = self.struct.size
+        buffer = self._buffer
+        for block in self.blocks():
+            used = len(block)
+            count = used // size
+            for column, typecode, (offset, width, code) in zip(
+                    columns, types, layout):
+                if typecode is None:
+                    continue
+                data = bytearray(count * width)
+                for i in range(width):
+                    data[i::width] = buffer[offset + i:used:size]
+                values = array.array(typecode, data)
+                if swap:
+                    values.byteswap()
+                column.extend(values)
+            if others:
+                fields = list(zip(*self.struct.iter_unpack(block)))
+                for i in others:
+                    columns[i].extend(fields[i])
+        return columns
+
+
+if __name__ == '__main__':
+    import collections
+    import io
+
+    Reading = collections.namedtuple('Reading', 'sensor timestamp value')
+    s = struct.Struct('<4sId')
+    data = b''.join(s.pack(b'T%03d' % (i % 3), 1000 + i, i * 0.5)
+                    for i in range(7))
+    print('record size:', s.size, 'file size:', len(data))
+
+    # 块的大小不是记录大小的整数倍，让记录跨越块的边界
+    reader = RecordReader(io.BytesIO(data), s, block_size=40)
+    print('records per block:',
+          [len(block) // s.size for block in reader.blocks()])
+    reader.f.seek(0)
+    for record in reader.records(Reading):
+        print(record)
+
+    reader = RecordReader(io.BytesIO(data), s)
+    sensors, timestamps, values = reader.columns()
+    print('\ncolumn types:', reader.column_types())
+    print(sensors)
+    print(timestamps)
+    print(values)
+
+    try:
+        list(RecordReader(io.BytesIO(data[:-3]), s))
+    except ValueError as err:
+        print('\nERROR:', err)
@@ -0,0 +1,69 @@
+# struct_stream_benchmark.py
+
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from struct_stream import RecordReader
+
+RECORD = struct.Struct('<QdI')      # 时间戳, 读数, 传感器编号
+
+
+def one_at_a_time(f):
+    """每次读一条记录再用unpack()解码"""
+    unpack, size = RECORD.unpack, RECORD.size
+    count = 0
+    while True:
+        data = f.read(size)
+        if not data:
+            return count
+        unpack(data)
+        count += 1
+
+
+def unpack_from(f):
+    """读入整个文件，用unpack_from()逐条解码"""
+    data = f.read()
+    unpack, size = RECORD.unpack_from, RECORD.size
+    for offset in range(0, len(data), size):
+        unpack(data, offset)
+    return len(data) // size
+
+
+def stream(f):
+    count = 0
+    for record in RecordReader(f, RECORD):
+        count += 1
+    return count
+
+
+def stream_columns(f):
+    return len(RecordReader(f, RECORD).columns()[0])
+
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+
+with tempfile.NamedTemporaryFile(delete=False) as f:
+    block = b''.join(RECORD.pack(1500000000000 + i, i * 0.25, i % 100)
+                     for i in range(100000))
+    for _ in range(count // 100000):
+        f.write(block)
+try:
+    size = os.path.getsize(f.name)
+    print('{} records, {:.1f}MB'.format(size // RECORD.size, size / 2 ** 20))
+    print('{:<16} {:>10} {:>14} {:>10}'.format(
+        'method', 'time(s)', 'records/s', 'MB/s'))
+    for name, func in [('read+unpack', one_at_a_time),
+                       ('unpack_from', unpack_from),
+                       ('RecordReader', stream),
+                       ('columns', stream_columns)]:
+        with open(f.name, 'rb') as input:
+            start = time.perf_counter()
+            records = func(input)
+            elapsed = time.perf_counter() - start
+        print('{:<16} {:>10.2f} {:>14,.0f} {:>10.1f}'.format(
+            name, elapsed, records / elapsed, size / 2 ** 20 / elapsed))
+finally:
+    os.remove(f.name)